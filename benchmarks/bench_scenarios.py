@@ -0,0 +1,148 @@
+"""Benchmark of the main scenarios on a synthetic Java tree, with the offline fake LLM backend.
+
+Each scenario runs prose in a fresh process, and its wall time and peak RSS are reported as JSON, so that the results
+can be compared release over release. The scenarios run in order on the same workspace:
+
+    cold_add      add of the whole tree, nothing cached
+    noop_add      add again, nothing changed
+    status        full status, diffs included
+    merge         commit --merge, rewriting the sources and the tests
+    check         check of the whole tree, after the merge
+    method_edit   add after editing the body of a single method
+    checkout      switch to a new branch and back
+
+Usage:
+    python benchmarks/bench_scenarios.py [--classes 100] [--methods 10] [--jobs 1] [--output results.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+from corpus import generate_corpus
+
+BENCH_SRC_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+
+def run_prose(workspace: str, *args: str) -> dict:
+    """Runs a prose command and returns its wall time, its peak RSS and its exit code.
+    """
+    env = dict(os.environ, PYTHONPATH=BENCH_SRC_PATH, PAGER="cat")
+    with tempfile.TemporaryFile() as stderr:
+        start = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, "-m", "prose"] + list(args),
+            cwd=workspace,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=stderr,
+        )
+        # wait4 gives the resource usage of this process only, unlike getrusage(RUSAGE_CHILDREN)
+        _, status, usage = os.wait4(process.pid, 0)
+        wall_time = time.perf_counter() - start
+        process.returncode = os.waitstatus_to_exitcode(status)
+
+        # add and status exit with 1 while there are undocumented or untested methods, only a crash is a failure
+        stderr.seek(0)
+        errors = stderr.read().decode("utf8", errors="replace")
+        crashed = "Traceback" in errors
+        if crashed:
+            print(f"'prose {' '.join(args)}' crashed:\n{errors}", file=sys.stderr)
+
+    return {
+        "command": " ".join(args),
+        "wall_s": round(wall_time, 3),
+        "max_rss_kb": usage.ru_maxrss,
+        "exit_code": process.returncode,
+        "crashed": crashed,
+    }
+
+
+def edit_method(file_path: str) -> None:
+    with open(file_path, "r") as f:
+        content = f.read()
+    with open(file_path, "w") as f:
+        f.write(content.replace("this.state * 31", "this.state * 37", 1))
+
+
+def run_scenarios(workspace: str, file_paths: list[str], jobs: int) -> list[dict]:
+    def scenario(name: str, *commands: list[str]) -> dict:
+        runs = [run_prose(workspace, *command) for command in commands]
+        return {
+            "name": name,
+            "wall_s": round(sum(run["wall_s"] for run in runs), 3),
+            "max_rss_kb": max(run["max_rss_kb"] for run in runs),
+            "ok": not any(run["crashed"] for run in runs),
+            "runs": runs,
+        }
+
+    add = ["add", ".", "--jobs", str(jobs)]
+    results = [
+        scenario("cold_add", add),
+        scenario("noop_add", add),
+        scenario("status", ["status"]),
+        scenario("merge", ["commit", "--merge"]),
+        scenario("check", ["check", ".", "--jobs", str(jobs)]),
+    ]
+    edit_method(file_paths[0])
+    results += [
+        scenario("method_edit", add),
+        scenario("checkout", ["branch", "checkout", "bench"], ["branch", "checkout", "main"]),
+    ]
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--depth", type=int, default=3, help="nested packages of each class")
+    parser.add_argument("--packages", type=int, default=8, help="leaf packages")
+    parser.add_argument("--classes", type=int, default=100, help="classes")
+    parser.add_argument("--methods", type=int, default=10, help="methods per class")
+    parser.add_argument("--undocumented", type=float, default=0.5, help="ratio of methods without JAVADOC")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the generator")
+    parser.add_argument("--jobs", type=int, default=1, help="processes of add")
+    parser.add_argument("--latency", type=float, default=0, help="latency in seconds of the fake LLM backend")
+    parser.add_argument("--output", help="file to write the results to, stdout by default")
+    args = parser.parse_args()
+
+    corpus = {
+        "depth": args.depth,
+        "packages": args.packages,
+        "classes": args.classes,
+        "methods": args.methods,
+        "undocumented": args.undocumented,
+        "seed": args.seed,
+    }
+
+    with tempfile.TemporaryDirectory() as workspace:
+        file_paths = generate_corpus(os.path.join(workspace, "src", "main"), **corpus)
+        run_prose(workspace, "config", "set-base-path", "src/main")
+        run_prose(workspace, "config", "set-llm-backend", "fake")
+        run_prose(workspace, "config", "set-llm-fake-latency", str(args.latency))
+        scenarios = run_scenarios(workspace, file_paths, args.jobs)
+
+    results = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "corpus": corpus,
+        "jobs": args.jobs,
+        "latency": args.latency,
+        "scenarios": scenarios,
+    }
+    output = json.dumps(results, indent=4)
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    return 0 if all(scenario["ok"] for scenario in scenarios) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
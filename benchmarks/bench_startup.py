@@ -0,0 +1,109 @@
+"""Cold start benchmark of the read-only commands.
+
+Each command runs in a fresh interpreter with -X importtime, in an empty workspace. The benchmark fails if a command
+imports one of the heavy modules, or if its median import time exceeds the budget.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 5] [--budget-ms 200]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+STARTUP_COMMANDS = [
+    ["branch", "show"],
+    ["cache", "stats"],
+    ["config", "set-base-path", "."],
+    ["status", "--name-only"],
+    ["diff-tree", "HEAD", "stage"],
+    ["cat", "deadbeef"],
+]
+
+# Modules only needed by the commands parsing or querying the LLM
+STARTUP_FORBIDDEN_MODULES = [
+    "tree_sitter",
+    "openai",
+    "httpx",
+    "prose.parser.java.parser_java",
+    "prose.tree.tree_writer",
+]
+
+STARTUP_SRC_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+
+def run_command(command: list[str], workspace: str) -> tuple[float, float, set[str]]:
+    """Runs a command and returns its wall time, its import time in ms and the modules it imported.
+    """
+    env = dict(os.environ, PYTHONPATH=STARTUP_SRC_PATH, PAGER="cat")
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "prose"] + command,
+        cwd=workspace,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    wall_time = (time.perf_counter() - start) * 1000
+
+    import_time = 0
+    modules = set()
+    for line in result.stderr.splitlines():
+        if line.startswith("Traceback"):
+            raise RuntimeError(f"'prose {' '.join(command)}' failed:\n{result.stderr}")
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_time, _, module = line[len("import time:"):].split("|")
+        import_time += int(self_time)
+        modules.add(module.strip())
+
+    return wall_time, import_time / 1000, modules
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="runs of each command, the median is kept")
+    parser.add_argument("--budget-ms", type=float, default=200, help="maximum median import time of a command")
+    args = parser.parse_args()
+
+    results = []
+    failures = []
+    with tempfile.TemporaryDirectory() as workspace:
+        for command in STARTUP_COMMANDS:
+            runs = [run_command(command, workspace) for _ in range(args.runs)]
+            wall_time = statistics.median(run[0] for run in runs)
+            import_time = statistics.median(run[1] for run in runs)
+            heavy_modules = sorted(
+                module
+                for module in set().union(*(run[2] for run in runs))
+                if module.split(".")[0] in STARTUP_FORBIDDEN_MODULES or module in STARTUP_FORBIDDEN_MODULES
+            )
+
+            name = " ".join(command)
+            results.append(
+                {
+                    "command": name,
+                    "wall_ms": round(wall_time, 1),
+                    "import_ms": round(import_time, 1),
+                    "heavy_modules": heavy_modules,
+                }
+            )
+            if len(heavy_modules) > 0:
+                failures.append(f"'prose {name}' imports {', '.join(heavy_modules)}")
+            if import_time > args.budget_ms:
+                failures.append(f"'prose {name}' imports in {import_time:.1f} ms, over {args.budget_ms} ms")
+
+    print(json.dumps({"budget_ms": args.budget_ms, "results": results}, indent=4))
+    for failure in failures:
+        print(failure, file=sys.stderr)
+    return 1 if len(failures) > 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
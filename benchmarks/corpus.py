@@ -0,0 +1,129 @@
+"""Generator of synthetic Java source trees for the benchmarks.
+
+The classes are spread over nested packages, and a ratio of their methods has no JAVADOC comment, so that prose has
+something to document. The same arguments always generate the same tree.
+
+Usage:
+    python benchmarks/corpus.py <path> [--depth 3] [--packages 8] [--classes 100] [--methods 10] [--undocumented 0.5]
+"""
+
+import argparse
+import os
+import random
+
+CORPUS_TYPES = ["int", "long", "double", "String", "boolean"]
+CORPUS_VALUES = {"int": "0", "long": "0L", "double": "0.0", "String": '""', "boolean": "false"}
+CORPUS_WORDS = ["frame", "sprite", "buffer", "index", "count", "width", "height", "offset", "value", "name"]
+
+
+def generate_corpus(
+    path: str,
+    depth: int = 3,
+    packages: int = 8,
+    classes: int = 100,
+    methods: int = 10,
+    undocumented: float = 0.5,
+    seed: int = 0,
+) -> list[str]:
+    """Writes the Java files of a synthetic tree under path/java.
+
+    Args:
+        path (str): The source root, such as src/main.
+        depth (int): The number of nested packages of each class.
+        packages (int): The number of leaf packages the classes are spread over.
+        classes (int): The number of classes.
+        methods (int): The number of methods of each class.
+        undocumented (float): The ratio of methods without a JAVADOC comment.
+        seed (int): The seed of the generator.
+
+    Returns:
+        The paths of the generated files.
+    """
+    rng = random.Random(seed)
+    package_names = [
+        ".".join(["org", "bench"] + [f"p{i}l{level}" for level in range(depth)])
+        for i in range(packages)
+    ]
+
+    file_paths = []
+    for i in range(classes):
+        package_name = package_names[i % len(package_names)]
+        class_name = f"Class{i}"
+        package_path = os.path.join(path, "java", *package_name.split("."))
+        os.makedirs(package_path, exist_ok=True)
+
+        file_path = os.path.join(package_path, class_name + ".java")
+        with open(file_path, "w") as f:
+            f.write(generate_class(rng, package_name, class_name, methods, undocumented))
+        file_paths.append(file_path)
+
+    return file_paths
+
+
+def generate_class(rng: random.Random, package_name: str, class_name: str, methods: int, undocumented: float) -> str:
+    lines = [
+        f"package {package_name};",
+        "",
+        "import java.util.List;",
+        "",
+        "/**",
+        f" * {class_name} of the benchmark corpus.",
+        " */",
+        f"public class {class_name}",
+        "{",
+        "    private int state;",
+        "",
+    ]
+    for i in range(methods):
+        lines += generate_method(rng, i, rng.random() >= undocumented)
+    lines += ["}", ""]
+    return "\n".join(lines)
+
+
+def generate_method(rng: random.Random, index: int, documented: bool) -> list[str]:
+    return_type = rng.choice(CORPUS_TYPES)
+    word = rng.choice(CORPUS_WORDS)
+    name = f"get{word.capitalize()}{index}"
+    parameters = [(rng.choice(CORPUS_TYPES), f"{rng.choice(CORPUS_WORDS)}{j}") for j in range(rng.randint(0, 3))]
+
+    lines = []
+    if documented:
+        lines += [
+            "    /**",
+            f"     * Returns the {word} {index}.",
+        ]
+        lines += [f"     * @param {parameter} the {parameter}" for _, parameter in parameters]
+        lines += [
+            f"     * @return the {word}",
+            "     */",
+        ]
+    lines += [f"    public {return_type} {name}({', '.join(f'{t} {p}' for t, p in parameters)}) {{"]
+    for j in range(rng.randint(1, 6)):
+        lines += [f"        this.state = this.state * 31 + {rng.randint(0, 1000)};"]
+    lines += [
+        f"        return {CORPUS_VALUES[return_type]};",
+        "    }",
+        "",
+    ]
+    return lines
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="source root of the generated tree, such as src/main")
+    parser.add_argument("--depth", type=int, default=3, help="nested packages of each class")
+    parser.add_argument("--packages", type=int, default=8, help="leaf packages")
+    parser.add_argument("--classes", type=int, default=100, help="classes")
+    parser.add_argument("--methods", type=int, default=10, help="methods per class")
+    parser.add_argument("--undocumented", type=float, default=0.5, help="ratio of methods without JAVADOC")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the generator")
+    args = parser.parse_args()
+
+    file_paths = generate_corpus(
+        args.path, args.depth, args.packages, args.classes, args.methods, args.undocumented, args.seed
+    )
+    print(f"{len(file_paths)} files generated in {args.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,17 @@
+import atexit
+
 import fire
 import fire.core
 
 from prose.branch import BranchOp
+from prose.cache import CacheOp
 from prose.config import ConfigOp
 from prose.default import DefaultOp
+from prose.stage import StageOp
 from prose.domain.blob.config import Config
 from prose.dao.blob.config_repository import ConfigRepository
+from prose.dao.blob.object_cache import OBJECT_CACHE
+from prose.util.profiler import PROFILE_DEFAULT_PATH, PROFILER
 
 
 class Main(DefaultOp):
@@ -18,7 +24,16 @@ class Main(DefaultOp):
     without documentation or tests. Additionally, Prose adds a summary to the README file.
     """
 
-    def __init__(self):
+    def __init__(self, profile: bool | str = False):
+        """
+        Args:
+            profile (bool | str): Write a Chrome trace of the command, to .prose/profile.json or to the given path.
+        """
+        if profile:
+            profile_path = PROFILE_DEFAULT_PATH if profile is True else profile
+            PROFILER.start()
+            atexit.register(lambda: PROFILER.write(profile_path, object_cache=OBJECT_CACHE.stats()))
+
         config_repo = ConfigRepository()
         config = config_repo.load() or Config(".", "main")
         if not config_repo.exists():
@@ -27,6 +42,8 @@ class Main(DefaultOp):
         super().__init__(config)
         self.config = ConfigOp(config)
         self.branch = BranchOp(config)
+        self.cache = CacheOp(config)
+        self.stage = StageOp(config)
 
 if __name__ == "__main__":
     fire.core.Display = lambda lines, out: print(*lines, file=out)
@@ -0,0 +1,26 @@
+from prose.dao.blob.llm_cache_repository import LLMCacheRepository
+from prose.domain.blob.config import Config
+
+
+class CacheOp:
+
+    def __init__(self, config: Config):
+        self._config = config
+        self._llm_cache_repo = LLMCacheRepository()
+
+    def stats(self):
+        """Show the number and the total size of the cached LLM responses.
+        """
+        count, size = self._llm_cache_repo.stats()
+        print(f"{count} responses, {size} bytes (max {self._config.llm_cache_max_size} bytes)")
+
+    def prune(self, max_size: int | None = None):
+        """Evict the least recently used LLM responses until the cache fits in its maximum size.
+
+        Args:
+            max_size (int): The maximum size of the cache in bytes, the configured size by default.
+        """
+        if max_size is None:
+            max_size = self._config.llm_cache_max_size
+        count = self._llm_cache_repo.prune(max_size)
+        print(f"{count} responses evicted")
@@ -13,3 +13,48 @@ class ConfigOp:
         """
         self._config.base_path = base_path
         self._config_repo.save(self._config)
+
+    def set_llm_backend(self, backend: str):
+        """Set the LLM backend.
+
+        Args:
+            backend (str): "openai", "fake" for an offline stub, "record" to record the OpenAI transcripts into the
+                cassette or "replay" to replay them.
+        """
+        self._config.llm_backend = backend
+        self._config_repo.save(self._config)
+
+    def set_llm_fake_latency(self, latency: float):
+        """Set the synthetic latency in seconds of the fake LLM backend.
+        """
+        self._config.llm_fake_latency = latency
+        self._config_repo.save(self._config)
+
+    def set_llm_cassette(self, path: str):
+        """Set the path of the cassette recorded and replayed by the record and replay LLM backends.
+        """
+        self._config.llm_cassette = path
+        self._config_repo.save(self._config)
+
+    def set_llm_max_in_flight(self, max_in_flight: int):
+        """Set the maximum number of concurrent LLM requests.
+        """
+        self._config.llm_max_in_flight = max_in_flight
+        self._config_repo.save(self._config)
+
+    def set_llm_rate_limits(self, requests_per_minute: int = 0, tokens_per_minute: int = 0):
+        """Set the LLM quotas, 0 meaning no limit.
+
+        Args:
+            requests_per_minute (int): The maximum number of requests per minute.
+            tokens_per_minute (int): The maximum number of tokens per minute.
+        """
+        self._config.llm_requests_per_minute = requests_per_minute
+        self._config.llm_tokens_per_minute = tokens_per_minute
+        self._config_repo.save(self._config)
+
+    def set_llm_cache_max_size(self, max_size: int):
+        """Set the maximum size in bytes of the LLM response cache.
+        """
+        self._config.llm_cache_max_size = max_size
+        self._config_repo.save(self._config)
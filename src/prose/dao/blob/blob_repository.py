@@ -1,37 +1,31 @@
-import os
-import json
-
-import jsbeautifier
-
-from prose.domain.blob.tree import Tree
+from prose.dao.blob.object_cache import OBJECT_CACHE
+from prose.dao.blob.object_repository import ObjectRepository
 from prose.util.util import get_digest_string
 
 
 class BlobRepository:
 
     def __init__(self):
-        pass
+        self.object_repo = ObjectRepository()
 
     def exists(self, digest: str) -> bool:
-        object_path = os.path.join(".prose", "objects", digest[:2], digest)
-        return os.path.exists(object_path)
+        return OBJECT_CACHE.contains("blob", digest) or self.object_repo.exists(digest)
 
     def load(self, digest: str) -> str | None:
-        object_path = os.path.join(".prose", "objects", digest[:2], digest)
-        if os.path.exists(object_path):
-            with open(object_path, "r") as f:
-                return f.read()
+        content = OBJECT_CACHE.get("blob", digest)
+        if content is not None:
+            return content
+
+        content = self.object_repo.load(digest)
+        if content is not None:
+            OBJECT_CACHE.put("blob", digest, content, len(content))
+        return content
 
     def save(self, content: str, digest: str | None = None) -> str:
         if digest is None:
             digest = get_digest_string(content)
 
-        object_parent_path = os.path.join(".prose", "objects", digest[:2])
-        os.makedirs(object_parent_path, exist_ok=True)
-
-        object_path = os.path.join(object_parent_path, digest)
-        if not os.path.exists(object_path):
-            with open(object_path, "w") as f:
-                f.write(content)
+        self.object_repo.save(content, digest)
+        OBJECT_CACHE.put("blob", digest, content, len(content))
 
         return digest
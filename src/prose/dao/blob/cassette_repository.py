@@ -0,0 +1,39 @@
+import json
+import os
+from threading import Lock
+
+
+class CassetteRepository:
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = Lock()
+        self.responses: dict[str, dict] | None = None
+
+    def load(self, digest: str) -> dict | None:
+        with self.lock:
+            if self.responses is None:
+                self.responses = self._read()
+            return self.responses.get(digest)
+
+    def save(self, digest: str, content: dict) -> None:
+        with self.lock:
+            if self.responses is None:
+                self.responses = self._read()
+            self.responses[digest] = content
+
+            parent_path = os.path.dirname(self.path)
+            if parent_path != "":
+                os.makedirs(parent_path, exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write(json.dumps({"digest": digest, **content}) + "\n")
+
+    def _read(self) -> dict[str, dict]:
+        responses = {}
+        if os.path.exists(self.path):
+            with open(self.path, "r") as f:
+                for line in f:
+                    if line.strip() != "":
+                        record = json.loads(line)
+                        responses[record.pop("digest")] = record
+        return responses
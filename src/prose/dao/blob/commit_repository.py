@@ -1,36 +1,37 @@
-import os
-import json
-
-import jsbeautifier
-
+from prose.dao.blob.object_cache import OBJECT_CACHE
+from prose.dao.blob.object_repository import ObjectRepository
 from prose.domain.blob.commit import Commit
-from prose.util.util import get_digest_object
+from prose.util.util import decode_object, encode_object, get_digest_object
 
 
 class CommitRepository:
 
     def __init__(self):
-        pass
+        self.object_repo = ObjectRepository()
 
     def exists(self, digest: str) -> bool:
-        object_path = os.path.join(".prose", "objects", digest[:2], digest)
-        return os.path.exists(object_path)
+        return OBJECT_CACHE.contains("commit", digest) or self.object_repo.exists(digest)
 
     def load(self, digest: str) -> Commit | None:
-        object_path = os.path.join(".prose", "objects", digest[:2], digest)
-        if os.path.exists(object_path):
-            with open(object_path, "r") as f:
-                return Commit.of(json.load(f))
+        commit = OBJECT_CACHE.get("commit", digest)
+        if commit is not None:
+            return commit
+
+        content = self.object_repo.load(digest)
+        if content is not None:
+            data = decode_object(content)
+            if not isinstance(data, dict):
+                return None
+            commit = Commit.of(data)
+            OBJECT_CACHE.put("commit", digest, commit, len(content))
+            return commit
 
     def save(self,content: Commit,digest: str | None = None) -> str:
         if digest is None:
             digest = get_digest_object(content.asdict())
 
-        object_parent_path = os.path.join(".prose", "objects", digest[:2])
-        os.makedirs(object_parent_path, exist_ok=True)
-
-        object_path = os.path.join(object_parent_path, digest)
-        with open(object_path, "w") as f:
-            f.write(jsbeautifier.beautify(json.dumps(content.asdict())))
+        serialized_content = encode_object(content.asdict())
+        self.object_repo.save(serialized_content, digest, overwrite=True)
+        OBJECT_CACHE.put("commit", digest, content, len(serialized_content))
 
         return digest
@@ -1,10 +1,8 @@
 import os
 import json
 
-import jsbeautifier
-
 from prose.domain.blob.config import Config
-from prose.util.util import get_digest_object
+from prose.util.util import decode_object
 
 
 class ConfigRepository:
@@ -20,7 +18,7 @@ class ConfigRepository:
         object_path = os.path.join(".prose", "config")
         if os.path.exists(object_path):
             with open(object_path, "r") as f:
-                return Config.of(json.load(f))
+                return Config.of(decode_object(f.read()))
 
     def save(self, content: Config) -> None:
         object_parent_path = os.path.join(".prose")
@@ -28,6 +26,4 @@ class ConfigRepository:
 
         object_path = os.path.join(object_parent_path, "config")
         with open(object_path, "w") as f:
-            f.write(
-                jsbeautifier.beautify(json.dumps(content.asdict()))
-            )
+            f.write(json.dumps(content.asdict(), indent=4))
@@ -0,0 +1,53 @@
+import json
+import os
+from threading import Lock
+
+JOURNAL_PATH = os.path.join(".prose", "journal")
+
+
+class JournalRepository:
+    """Append-only journal of the LLM results of an add, so that an interrupted add resumes where it stopped.
+
+    Each result is appended as a JSON line and synced to disk as soon as it arrives. A line torn by a crash is ignored
+    when the journal is read back.
+    """
+
+    def __init__(self, path: str = JOURNAL_PATH):
+        self.path = path
+        self.lock = Lock()
+
+    def load(self) -> dict[tuple[str, str], dict]:
+        """Returns the results by digest and kind, and drops the line torn by a crash, if any.
+        """
+        if not os.path.exists(self.path):
+            return {}
+
+        with self.lock:
+            with open(self.path, "rb+") as f:
+                content = f.read()
+                end = content.rfind(b"\n") + 1
+                if end < len(content):
+                    f.truncate(end)
+
+        entries = {}
+        for line in content[:end].decode("utf-8", errors="replace").splitlines():
+            try:
+                entry = json.loads(line)
+                entries[(entry["digest"], entry["kind"])] = entry["result"]
+            except (ValueError, KeyError, TypeError):
+                continue
+        return entries
+
+    def append(self, digest: str, kind: str, result: dict) -> None:
+        line = json.dumps({"digest": digest, "kind": kind, "result": result}) + "\n"
+        with self.lock:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def clear(self) -> None:
+        with self.lock:
+            if os.path.exists(self.path):
+                os.remove(self.path)
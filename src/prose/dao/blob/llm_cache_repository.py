@@ -0,0 +1,58 @@
+import os
+import tempfile
+
+
+class LLMCacheRepository:
+
+    def load(self, digest: str) -> str | None:
+        response_path = os.path.join(".prose", "cache", digest[:2], digest)
+        try:
+            with open(response_path, "r") as f:
+                response = f.read()
+        except FileNotFoundError:
+            return None
+
+        # The modification time tracks the last use, so pruning evicts the least recently used responses first
+        os.utime(response_path)
+        return response
+
+    def save(self, digest: str, content: str) -> None:
+        response_parent_path = os.path.join(".prose", "cache", digest[:2])
+        os.makedirs(response_parent_path, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=response_parent_path)
+        with os.fdopen(fd, "w") as f:
+            f.write(content)
+        os.replace(tmp_path, os.path.join(response_parent_path, digest))
+
+    def stats(self) -> tuple[int, int]:
+        entries = self._list()
+        return len(entries), sum(size for _, _, size in entries)
+
+    def prune(self, max_size: int) -> int:
+        entries = sorted(self._list())
+        size = sum(size for _, _, size in entries)
+
+        count = 0
+        for _, response_path, response_size in entries:
+            if size <= max_size:
+                break
+            os.remove(response_path)
+            size -= response_size
+            count += 1
+        return count
+
+    def _list(self) -> list[tuple[int, str, int]]:
+        cache_path = os.path.join(".prose", "cache")
+        if not os.path.isdir(cache_path):
+            return []
+
+        entries = []
+        for folder in os.scandir(cache_path):
+            if not folder.is_dir():
+                continue
+            for entry in os.scandir(folder.path):
+                if entry.is_file() and not entry.name.endswith(".tmp"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime_ns, entry.path, stat.st_size))
+        return entries
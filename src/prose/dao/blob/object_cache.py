@@ -0,0 +1,62 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Any
+
+OBJECT_CACHE_MAX_SIZE = 64 * 1024 * 1024
+
+
+class ObjectCache:
+    """LRU cache of parsed objects, bounded by the size of their serialized content.
+    """
+
+    def __init__(self, max_size: int = OBJECT_CACHE_MAX_SIZE):
+        self.max_size = max_size
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._objects: OrderedDict[tuple[str, str], tuple[Any, int]] = OrderedDict()
+        self._lock = Lock()
+
+    def contains(self, kind: str, digest: str) -> bool:
+        with self._lock:
+            return (kind, digest) in self._objects
+
+    def get(self, kind: str, digest: str) -> Any | None:
+        with self._lock:
+            entry = self._objects.get((kind, digest))
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._objects.move_to_end((kind, digest))
+            return entry[0]
+
+    def put(self, kind: str, digest: str, content: Any, size: int) -> None:
+        if size > self.max_size:
+            return
+        with self._lock:
+            entry = self._objects.pop((kind, digest), None)
+            if entry is not None:
+                self.size -= entry[1]
+            self._objects[(kind, digest)] = (content, size)
+            self.size += size
+            while self.size > self.max_size:
+                _, (_, evicted_size) = self._objects.popitem(last=False)
+                self.size -= evicted_size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._objects.clear()
+            self.size = 0
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "objects": len(self._objects),
+                "size": self.size,
+            }
+
+
+OBJECT_CACHE = ObjectCache()
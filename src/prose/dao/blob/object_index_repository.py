@@ -0,0 +1,28 @@
+import os
+
+from prose.domain.blob.object_index import ObjectIndex
+from prose.util.util import decode_object, encode_object
+
+
+class ObjectIndexRepository:
+
+    def __init__(self):
+        pass
+
+    def exists(self) -> bool:
+        object_path = os.path.join(".prose", "index-objects")
+        return os.path.exists(object_path)
+
+    def load(self) -> ObjectIndex | None:
+        object_path = os.path.join(".prose", "index-objects")
+        if os.path.exists(object_path):
+            with open(object_path, "r") as f:
+                return ObjectIndex.of(decode_object(f.read()))
+
+    def save(self, content: ObjectIndex) -> None:
+        object_parent_path = os.path.join(".prose")
+        os.makedirs(object_parent_path, exist_ok=True)
+
+        object_path = os.path.join(object_parent_path, "index-objects")
+        with open(object_path, "w") as f:
+            f.write(encode_object(content.asdict()))
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import os
+
+from prose.dao.blob.pack_repository import PackRepository
+from prose.util.profiler import PROFILER
+
+
+class ObjectRepository:
+
+    def __init__(self, root: str = ".prose"):
+        self.objects_path = os.path.join(root, "objects")
+        self.pack_repo = PackRepository(root)
+
+    def exists(self, digest: str) -> bool:
+        if self.pack_repo.exists(digest) or os.path.exists(self._get_object_path(digest)):
+            return True
+        # The loose object may have been packed by another process since the pack was opened
+        return self.pack_repo.reload() and self.pack_repo.exists(digest)
+
+    def load(self, digest: str) -> str | None:
+        content = self.pack_repo.load(digest)
+        if content is not None:
+            return content.decode("utf-8")
+
+        try:
+            with open(self._get_object_path(digest), "r") as f:
+                return f.read()
+        except FileNotFoundError:
+            pass
+
+        # The loose object may have been packed by another process since the pack was opened
+        if self.pack_repo.reload():
+            content = self.pack_repo.load(digest)
+            if content is not None:
+                return content.decode("utf-8")
+
+    def save(self, content: str, digest: str, overwrite: bool = False) -> None:
+        if not overwrite and self.exists(digest):
+            return
+
+        with PROFILER.span(digest, "store", stage=True, size=len(content)):
+            object_parent_path = os.path.join(self.objects_path, digest[:2])
+            os.makedirs(object_parent_path, exist_ok=True)
+
+            with open(os.path.join(object_parent_path, digest), "w") as f:
+                f.write(content)
+
+    def digests(self) -> list[str]:
+        return sorted(set(self.pack_repo.digests()) | {digest for digest, _ in self._get_loose_paths()})
+
+    def copy(self, other: ObjectRepository) -> int:
+        """Copies the objects of another repository missing from this one, and returns their number.
+        """
+        count = 0
+        for digest in other.digests():
+            if not self.exists(digest):
+                content = other.load(digest)
+                if content is not None:
+                    self.save(content, digest)
+                    count += 1
+        return count
+
+    def pack(self) -> int:
+        loose_paths = self._get_loose_paths()
+
+        objects = []
+        for digest, object_path in loose_paths:
+            with open(object_path, "rb") as f:
+                objects.append((digest, f.read()))
+        count = self.pack_repo.save(objects)
+
+        for _, object_path in loose_paths:
+            os.remove(object_path)
+        for folder in {os.path.dirname(object_path) for _, object_path in loose_paths}:
+            if len(os.listdir(folder)) == 0:
+                os.rmdir(folder)
+
+        return count
+
+    def _get_loose_paths(self) -> list[tuple[str, str]]:
+        if not os.path.isdir(self.objects_path):
+            return []
+
+        loose_paths = []
+        for folder in sorted(os.listdir(self.objects_path)):
+            folder_path = os.path.join(self.objects_path, folder)
+            if len(folder) != 2 or not os.path.isdir(folder_path):
+                continue
+            for digest in sorted(os.listdir(folder_path)):
+                if digest.startswith(folder) and len(digest) == 64:
+                    loose_paths.append((digest, os.path.join(folder_path, digest)))
+        return loose_paths
+
+    def _get_object_path(self, digest: str) -> str:
+        return os.path.join(self.objects_path, digest[:2], digest)
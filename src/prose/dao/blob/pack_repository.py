@@ -0,0 +1,154 @@
+import mmap
+import os
+import struct
+
+PACK_MAGIC = b"PPCK"
+INDEX_MAGIC = b"PIDX"
+PACK_VERSION = 1
+
+PACK_HEADER = struct.Struct(">4sI")
+INDEX_HEADER = struct.Struct(">4sIQ")
+INDEX_ENTRY = struct.Struct(">32sQQ")
+
+
+class PackRepository:
+    """Append-only pack of objects with a sorted (digest, offset, size) index, memory-mapped and binary-searched.
+    """
+
+    def __init__(self, root: str = ".prose"):
+        self.pack_path = os.path.join(root, "objects", "pack", "objects.pack")
+        self.index_path = os.path.join(root, "objects", "pack", "objects.idx")
+        self._opened = False
+        self._pack: mmap.mmap | None = None
+        self._index: mmap.mmap | None = None
+        self._count = 0
+        self._index_stat: tuple[int, int, int] | None = None
+
+    def exists(self, digest: str) -> bool:
+        return self._find(digest) is not None
+
+    def load(self, digest: str) -> bytes | None:
+        entry = self._find(digest)
+        if entry is None or self._pack is None:
+            return None
+        offset, size = entry
+        return self._pack[offset : offset + size]
+
+    def digests(self) -> list[str]:
+        return [digest.hex() for digest, _, _ in self._read_entries()]
+
+    def save(self, objects: list[tuple[str, bytes]]) -> int:
+        entries = {digest: (offset, size) for digest, offset, size in self._read_entries()}
+        objects = [(bytes.fromhex(digest), content) for digest, content in objects]
+        objects = [(digest, content) for digest, content in objects if digest not in entries]
+        if len(objects) == 0:
+            return 0
+
+        os.makedirs(os.path.dirname(self.pack_path), exist_ok=True)
+
+        with open(self.pack_path, "ab") as f:
+            if f.tell() == 0:
+                f.write(PACK_HEADER.pack(PACK_MAGIC, PACK_VERSION))
+            for digest, content in objects:
+                entries[digest] = (f.tell(), len(content))
+                f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+
+        index_tmp_path = self.index_path + ".tmp"
+        with open(index_tmp_path, "wb") as f:
+            f.write(INDEX_HEADER.pack(INDEX_MAGIC, PACK_VERSION, len(entries)))
+            for digest in sorted(entries):
+                f.write(INDEX_ENTRY.pack(digest, *entries[digest]))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(index_tmp_path, self.index_path)
+
+        self.close()
+        return len(objects)
+
+    def reload(self) -> bool:
+        """Reopens the index if another process packed objects since it was opened, as git does on a miss.
+
+        Returns:
+            True if the index was reopened.
+        """
+        if not self._opened or self._get_index_stat() == self._index_stat:
+            return False
+        self.close()
+        self._open()
+        return True
+
+    def close(self) -> None:
+        if self._pack is not None:
+            self._pack.close()
+        if self._index is not None:
+            self._index.close()
+        self._opened = False
+        self._pack = None
+        self._index = None
+        self._count = 0
+        self._index_stat = None
+
+    def _open(self) -> None:
+        self._opened = True
+        self._index_stat = self._get_index_stat()
+        try:
+            with open(self.index_path, "rb") as f:
+                index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            with open(self.pack_path, "rb") as f:
+                pack = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return
+
+        magic, version, count = INDEX_HEADER.unpack_from(index, 0)
+        if magic != INDEX_MAGIC or version != PACK_VERSION:
+            index.close()
+            pack.close()
+            return
+
+        self._index = index
+        self._pack = pack
+        self._count = count
+
+    def _get_index_stat(self) -> tuple[int, int, int] | None:
+        try:
+            stat = os.stat(self.index_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def _read_entries(self) -> list[tuple[bytes, int, int]]:
+        if not self._opened:
+            self._open()
+        if self._index is None:
+            return []
+        return [
+            INDEX_ENTRY.unpack_from(self._index, INDEX_HEADER.size + i * INDEX_ENTRY.size)
+            for i in range(self._count)
+        ]
+
+    def _find(self, digest: str) -> tuple[int, int] | None:
+        if not self._opened:
+            self._open()
+        if self._index is None:
+            return None
+
+        try:
+            key = bytes.fromhex(digest)
+        except ValueError:
+            return None
+
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            position = INDEX_HEADER.size + mid * INDEX_ENTRY.size
+            candidate = self._index[position : position + 32]
+            if candidate < key:
+                lo = mid + 1
+            elif candidate > key:
+                hi = mid
+            else:
+                _, offset, size = INDEX_ENTRY.unpack_from(self._index, position)
+                return (offset, size)
+        return None
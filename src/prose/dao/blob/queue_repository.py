@@ -0,0 +1,134 @@
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from prose.domain.blob.job import Job
+
+QUEUE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    digest TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    prompt TEXT NOT NULL,
+    target TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_until REAL NOT NULL DEFAULT 0,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, lease_until);
+"""
+
+# Seconds a worker waits for the lock held by another one
+QUEUE_BUSY_TIMEOUT = 30
+
+
+class QueueRepository:
+    """Queue of LLM jobs in a SQLite database, shared by the worker processes.
+
+    A job is claimed with a lease. A job whose lease expired, such as the one of a crashed worker, is claimed again by
+    the next worker. The claims run in immediate transactions, so a job is never leased to two workers at once.
+    """
+
+    def __init__(self, root: str = ".prose"):
+        self.path = os.path.join(root, "queue.db")
+        self._connection: sqlite3.Connection | None = None
+
+    def enqueue(self, jobs: list[Job]) -> int:
+        """Adds the jobs not queued yet, and requeues the finished ones, whose response is missing again.
+
+        Returns:
+            The number of jobs added or requeued.
+        """
+        with self._transaction() as connection:
+            count = connection.total_changes
+            connection.executemany(
+                "INSERT INTO jobs (digest, kind, prompt, target) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (digest) DO UPDATE SET status = 'pending', attempts = 0, error = NULL "
+                "WHERE status IN ('done', 'failed')",
+                [(job.digest, job.kind, job.prompt, job.target) for job in jobs],
+            )
+            return connection.total_changes - count
+
+    def claim(self, worker: str, lease: float) -> Job | None:
+        """Leases the oldest pending job, or a job whose lease expired, to a worker.
+        """
+        now = time.time()
+        with self._transaction() as connection:
+            row = connection.execute(
+                "SELECT digest, kind, prompt, target, status, attempts FROM jobs "
+                "WHERE status = 'pending' OR (status = 'leased' AND lease_until < ?) "
+                "ORDER BY rowid LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is None:
+                return None
+
+            job = Job(*row)
+            job.status = "leased"
+            job.attempts += 1
+            connection.execute(
+                "UPDATE jobs SET status = ?, attempts = ?, worker = ?, lease_until = ? WHERE digest = ?",
+                (job.status, job.attempts, worker, now + lease, job.digest),
+            )
+            return job
+
+    def complete(self, job: Job, worker: str) -> None:
+        self._finish(job, worker, "done", None)
+
+    def fail(self, job: Job, worker: str, error: str, max_attempts: int) -> None:
+        """Releases a failed job, to be retried until it reaches the maximum number of attempts.
+        """
+        self._finish(job, worker, "failed" if job.attempts >= max_attempts else "pending", error)
+
+    def stats(self) -> dict[str, int]:
+        """Returns the number of jobs by status, the leases expired counting as pending.
+        """
+        if self._connection is None and not os.path.exists(self.path):
+            return {}
+        rows = self._connect().execute(
+            "SELECT CASE WHEN status = 'leased' AND lease_until < ? THEN 'pending' ELSE status END, COUNT(*) "
+            "FROM jobs GROUP BY 1",
+            (time.time(),),
+        )
+        return {status: count for status, count in rows}
+
+    def errors(self) -> list[tuple[str, str]]:
+        """Returns the targets and the last errors of the failed jobs.
+        """
+        if self._connection is None and not os.path.exists(self.path):
+            return []
+        rows = self._connect().execute("SELECT target, error FROM jobs WHERE status = 'failed' ORDER BY rowid")
+        return [(target, error or "") for target, error in rows]
+
+    def _finish(self, job: Job, worker: str, status: str, error: str | None) -> None:
+        # A worker whose lease expired does not overwrite the job claimed again by another one
+        with self._transaction() as connection:
+            connection.execute(
+                "UPDATE jobs SET status = ?, error = ?, worker = NULL, lease_until = 0 "
+                "WHERE digest = ? AND status = 'leased' AND worker = ?",
+                (status, error, job.digest, worker),
+            )
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        # Immediate transactions take the write lock first, so that two claims never read the same pending job
+        connection = self._connect()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=QUEUE_BUSY_TIMEOUT, isolation_level=None)
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.executescript(QUEUE_SCHEMA)
+            self._connection = connection
+        return self._connection
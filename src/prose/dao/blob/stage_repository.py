@@ -1,33 +1,28 @@
 import os
-import json
-
-import jsbeautifier
 
 from prose.domain.blob.stage import Stage
-from prose.util.util import get_digest_object
+from prose.util.util import decode_object, encode_object
 
 
 class StageRepository:
 
-    def __init__(self):
-        pass
+    def __init__(self, root: str = ".prose"):
+        self.root = root
 
     def exists(self) -> bool:
-        object_path = os.path.join(".prose", "index")
+        object_path = os.path.join(self.root, "index")
         return os.path.exists(object_path)
 
     def load(self) -> Stage | None:
-        object_path = os.path.join(".prose", "index")
+        object_path = os.path.join(self.root, "index")
         if os.path.exists(object_path):
             with open(object_path, "r") as f:
-                return Stage.of(json.load(f))
+                return Stage.of(decode_object(f.read()))
 
     def save(self, content: Stage) -> None:
-        object_parent_path = os.path.join(".prose")
+        object_parent_path = os.path.join(self.root)
         os.makedirs(object_parent_path, exist_ok=True)
 
         object_path = os.path.join(object_parent_path, "index")
         with open(object_path, "w") as f:
-            f.write(
-                jsbeautifier.beautify(json.dumps(content.asdict()))
-            )
+            f.write(encode_object(content.asdict()))
@@ -0,0 +1,42 @@
+import os
+import time
+
+from prose.domain.blob.stat_entry import StatEntry
+from prose.util.util import decode_object, encode_object
+
+# Files modified less than this before the cache is written may change again without their mtime moving on
+# coarse-grained filesystems, so they are not cached and are hashed again on the next run (git's racy-clean rule).
+STAT_CACHE_RACY_WINDOW_NS = 2_000_000_000
+
+
+class StatCacheRepository:
+
+    def __init__(self):
+        pass
+
+    def load(self) -> dict[str, StatEntry]:
+        object_path = os.path.join(".prose", "stat")
+        if os.path.exists(object_path):
+            try:
+                with open(object_path, "r") as f:
+                    entries = decode_object(f.read())
+                return {path: StatEntry.of(entry) for path, entry in entries.items()}
+            except (ValueError, TypeError):
+                pass
+        return {}
+
+    def save(self, content: dict[str, StatEntry]) -> None:
+        object_parent_path = os.path.join(".prose")
+        os.makedirs(object_parent_path, exist_ok=True)
+
+        racy_mtime_ns = time.time_ns() - STAT_CACHE_RACY_WINDOW_NS
+        entries = {
+            path: entry.astuple()
+            for path, entry in content.items()
+            if entry.mtime_ns < racy_mtime_ns
+        }
+
+        object_path = os.path.join(object_parent_path, "stat")
+        with open(object_path + ".tmp", "w") as f:
+            f.write(encode_object(entries))
+        os.replace(object_path + ".tmp", object_path)
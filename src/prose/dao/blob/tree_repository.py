@@ -1,27 +1,29 @@
-import os
-import json
-
-import jsbeautifier
-
+from prose.dao.blob.object_cache import OBJECT_CACHE
+from prose.dao.blob.object_repository import ObjectRepository
 from prose.domain.blob.tree import Tree
-from prose.util.util import get_digest_object
+from prose.util.util import decode_object, encode_object, get_digest_object
 
 
 class TreeRepository:
 
     def __init__(self):
-        pass
+        self.object_repo = ObjectRepository()
 
     def exists(self, digest: str) -> bool:
-        object_path = os.path.join(".prose", "objects", digest[:2], digest)
-        return os.path.exists(object_path)
+        return OBJECT_CACHE.contains("tree", digest) or self.object_repo.exists(digest)
 
     def load(self, digest: str) -> list[Tree] | None:
+        # The cache keeps a tuple of frozen trees, so that no caller can change what the others load
+        tree = OBJECT_CACHE.get("tree", digest)
+        if tree is not None:
+            return list(tree)
+
         try:
-            object_path = os.path.join(".prose", "objects", digest[:2], digest)
-            if os.path.exists(object_path):
-                with open(object_path, "r") as f:
-                    return [Tree.of(x) for x in json.load(f)]
+            content = self.object_repo.load(digest)
+            if content is not None:
+                tree = tuple(Tree.of(x) for x in decode_object(content))
+                OBJECT_CACHE.put("tree", digest, tree, len(content))
+                return list(tree)
         except:
             return None
 
@@ -31,14 +33,9 @@ class TreeRepository:
         if digest is None:
             digest = get_digest_object(content_asdicts)
 
-        object_parent_path = os.path.join(".prose", "objects", digest[:2])
-        os.makedirs(object_parent_path, exist_ok=True)
-
-        object_path = os.path.join(object_parent_path, digest)
-        if not os.path.exists(object_path):
-            with open(object_path, "w") as f:
-                f.write(
-                    jsbeautifier.beautify(json.dumps(content_asdicts))
-                )
+        if not self.exists(digest):
+            serialized_content = encode_object(content_asdicts)
+            self.object_repo.save(serialized_content, digest)
+            OBJECT_CACHE.put("tree", digest, tuple(content), len(serialized_content))
 
         return digest
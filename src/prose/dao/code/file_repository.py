@@ -1,24 +1,31 @@
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import replace
 
 from tqdm import tqdm
 
+from prose.dao.blob.journal_repository import JournalRepository
 from prose.dao.blob.tree_repository import TreeRepository
 from prose.domain.code.clazz import Class
 from prose.domain.code.file import File
 from prose.domain.code.method import Method
+from prose.domain.code.test import Test
 from prose.llm.llm_base import LLMBase
+from prose.llm.llm_chat import LLM_CLASS_COMMENT, LLM_METHOD_COMMENT, LLM_METHOD_TESTS
 from prose.parser.code import Code
 from prose.parser.parser_base import ParserBase
+from prose.util.profiler import PROFILER
 
 
 class FileRepository:
 
     def __init__(self, parser: ParserBase, llm: LLMBase):
         self.tree_repo = TreeRepository()
+        self.journal_repo = JournalRepository()
+        self.journal: dict[tuple[str, str], dict] | None = None
         self.parser = parser
         self.llm = llm
-        pass
 
     def get_parser(self) -> ParserBase:
         return self.parser
@@ -26,39 +33,94 @@ class FileRepository:
     def get_lln(self) -> LLMBase:
         return self.llm
 
-    def load(self, path: str) -> File:
+    def load(self, path: str, file: File | None = None) -> File:
         print(f"Loading {path} ...")
 
-        file = File(os.path.basename(path), path)
-        code = self._parse_code(file)
+        if file is None:
+            file = self.parse(path)
         if file.clazz is None:
             return file
 
-        for i in tqdm(range(0, len(file.clazz.methods) + 1), ncols=80):
-            if i == 0:
-                self._parse_clazz(file.clazz)
-            else:
-                self._parse_method(file.clazz.methods[i - 1], code)
+        # The results journaled by an interrupted add are replayed before any query
+        if self.journal is None:
+            self.journal = self.journal_repo.load()
+        self._replay_clazz(file.clazz)
+
+        # The class comment is built from the method comments found in the code, so it works on a snapshot that the
+        # concurrent method queries and the replayed method comments do not update.
+        clazz = replace(file.clazz, methods=[replace(method) for method in file.clazz.methods])
+        for method in file.clazz.methods:
+            self._replay_method(method)
+
+        with ThreadPoolExecutor(max_workers=self.llm.get_max_in_flight()) as executor:
+            futures = [executor.submit(self._parse_clazz, clazz)] + [
+                executor.submit(self._parse_method, method) for method in file.clazz.methods
+            ]
+            try:
+                for future in tqdm(as_completed(futures), total=len(futures), ncols=80):
+                    future.result()
+            except BaseException:
+                executor.shutdown(cancel_futures=True)
+                raise
+
+        file.clazz.has_llm_comment = clazz.has_llm_comment
+        file.clazz.comment = clazz.comment
 
         return file
 
-    def _parse_code(self, file: File) -> Code:
-        code = Code(file)
+    def parse(self, path: str, src: bytes | None = None) -> File:
+        file = File(os.path.basename(path), path)
+        self._parse_code(file, src)
+        return file
+
+    def _parse_code(self, file: File, src: bytes | None = None) -> Code:
+        code = Code(file, src)
         code.load()
-        self.parser.parse(code)
+        with PROFILER.span(file.path, "parse", stage=True):
+            self.parser.parse(code)
         return code
 
     def _parse_clazz(self, clazz: Class) -> None:
         if clazz.comment is None:
             self.llm.commentify_class(clazz)
+            if clazz.digest is not None and clazz.has_llm_comment:
+                self.journal_repo.append(clazz.digest, LLM_CLASS_COMMENT, {"comment": clazz.comment})
 
-    def _parse_method(self, method: Method, code: Code) -> None:
+    def _parse_method(self, method: Method) -> None:
         if method.digest is None or self.tree_repo.exists(method.digest):
             return
 
-        if method.comment is None:
-            self.llm.commentify_method(method)
-
-        if method.tests is None:
-            self.llm.testify_method(method)
+        with PROFILER.span(method.name, "method", signature=method.signature):
+            if method.comment is None:
+                self.llm.commentify_method(method)
+                if method.has_llm_comment:
+                    self.journal_repo.append(method.digest, LLM_METHOD_COMMENT, {"comment": method.comment})
+
+            if method.tests is None:
+                self.llm.testify_method(method)
+                if method.has_llm_tests:
+                    self.journal_repo.append(
+                        method.digest,
+                        LLM_METHOD_TESTS,
+                        {"tests": [test.asdict() for test in method.tests or []]},
+                    )
+
+    def _replay_clazz(self, clazz: Class) -> None:
+        assert self.journal is not None
+        result = self.journal.get((clazz.digest or "", LLM_CLASS_COMMENT))
+        if clazz.comment is None and result is not None:
+            clazz.has_llm_comment = True
+            clazz.comment = result["comment"]
+
+    def _replay_method(self, method: Method) -> None:
+        assert self.journal is not None
+        result = self.journal.get((method.digest or "", LLM_METHOD_COMMENT))
+        if method.comment is None and result is not None:
+            method.has_llm_comment = True
+            method.comment = result["comment"]
+
+        result = self.journal.get((method.digest or "", LLM_METHOD_TESTS))
+        if method.tests is None and result is not None:
+            method.has_llm_tests = True
+            method.tests = [Test(**test) for test in result["tests"]]
 
@@ -1,21 +1,37 @@
+import bisect
 import difflib
+import itertools
+import json
 import os
-import pydoc
+import socket
+import time
+from collections import Counter
+from typing import Iterable, Iterator, cast
 
 from prose.dao.blob.blob_repository import BlobRepository
 from prose.dao.blob.commit_repository import CommitRepository
 from prose.dao.blob.config_repository import ConfigRepository
+from prose.dao.blob.journal_repository import JournalRepository
+from prose.dao.blob.llm_cache_repository import LLMCacheRepository
+from prose.dao.blob.object_index_repository import ObjectIndexRepository
+from prose.dao.blob.object_repository import ObjectRepository
 from prose.dao.blob.ref_repository import RefRepository
 from prose.dao.blob.stage_repository import StageRepository
+from prose.dao.blob.tree_repository import TreeRepository
 from prose.domain.blob.commit import Commit
 from prose.domain.blob.config import Config
+from prose.domain.blob.object_index import ObjectIndex
 from prose.domain.blob.stage import Stage
 from prose.domain.blob.tree import Tree
-from prose.llm.openai.llm_openai import LLMOpenAI
-from prose.parser.java.parser_java import ParserJava
-from prose.tree.tree_writer import TreeWriter
+from prose.llm.llm_base import LLMBase
+from prose.llm.llm_chat import LLMChat, LLMError
+from prose.llm.scheduler import TransientError
+from prose.parser.parser_base import ParserBase
+from prose.stage import parse_shard
+from prose.tree.tree_differ import TREE_ADDED, TREE_DELETED, TreeChange, TreeDiffer
 from prose.tree.tree_walker import TreeWalker
-from prose.util.util import die, panic
+from prose.util.pager import page
+from prose.util.util import decode_object, die, panic
 
 
 class DefaultOp:
@@ -27,58 +43,107 @@ class DefaultOp:
         self._ref_repo = RefRepository()
         self._commit_repo = CommitRepository()
         self._blob_repo = BlobRepository()
-        self._parser = ParserJava()
-        self._llm = LLMOpenAI(self._parser)
-
-    def status(self) -> None:
+        self._tree_repo = TreeRepository()
+        self._object_index_repo = ObjectIndexRepository()
+        # The parser and the LLM backend load tree-sitter and the HTTP client, so only the commands using them build
+        # them.
+        self._parser: ParserBase | None = None
+        self._llm: LLMBase | None = None
+
+    def status(self, all: bool = False, name_only: bool = False, stat: bool = False) -> None:
         """Show the working tree status.
+
+        Only the comments and tests changed since the last commit are shown, unless there is no commit yet. The diffs
+        are streamed to the pager file by file.
+
+        Args:
+            all (bool): Show all the comments and tests of the stage.
+            name_only (bool): Show only the paths of the files, without diffing them.
+            stat (bool): Show only the number of lines added and removed in each file, without diffing them.
         """
         stage = self._stage_repo.load()
         if stage is None:
             return die("No files staged")
 
-        output = [
-            f"stage {stage.tree}",
-            ""
-        ]
+        page(self._status(stage, all, name_only, stat))
 
-        def diff(file: Tree, path: str) -> None:
-            output.extend(self._diff(file, os.path.join(stage.path, path)))
-        TreeWalker(self._config).walk(stage.tree, diff)
+    def diff_tree(self, old: str, new: str = "stage") -> None:
+        """Show the comments and tests that differ between two trees.
 
-        pydoc.pager("\n".join(output))
+        Only the subtrees whose digests differ are compared. A tree only holds the files of its add, so a file missing
+        from the new tree is reported as deleted only if its source is gone. Two tree digests, without a source path,
+        are compared as they are.
+
+        Args:
+            old (str): The old tree: "stage", "HEAD", a branch, a commit or a tree.
+            new (str): The new tree: "stage", "HEAD", a branch, a commit or a tree.
+        """
+        old_resolved = self._resolve_tree(old)
+        if old_resolved is None:
+            return panic(f"Unknown tree '{old}'")
+        new_resolved = self._resolve_tree(new)
+        if new_resolved is None:
+            return panic(f"Unknown tree '{new}'")
+        old_tree, old_path = old_resolved
+        new_tree, new_path = new_resolved
+
+        changes = TreeDiffer(self._config).iter(old_tree, new_tree)
+        src_path = new_path or old_path
+        if src_path is not None:
+            changes = self._filter_deleted(changes, src_path)
+
+        for status, old_file, new_file, path in changes:
+            file = new_file or old_file
+            assert file is not None
+            print(f"{status[0].upper()} {file.type} {file.digest} {os.path.join(path, file.name)}")
 
     def diff(self, object: str) -> None:
         """Provide the diff contents or details of repository objects.
 
         Args:
-            object (str): The name of the object to diff.
+            object (str): The name of the object to diff, or an abbreviation of it.
         """
         stage = self._stage_repo.load()
         if stage is None:
             return die("No files staged")
 
-        output = [
-            f"stage {stage.tree}",
-            ""
-        ]
-
-        def diff_one_object(file: Tree, path: str) -> None:
-            if object == file.digest:
-                output.extend(self._diff(file, os.path.join(stage.path, path)))
-        TreeWalker(self._config).walk(stage.tree, diff_one_object)
+        found = self._find_object(stage, object)
+        if found is None:
+            return die(f"Object '{object}' not found in the stage")
+        file, path = found
 
-        pydoc.pager("\n".join(output))
+        page(itertools.chain([f"stage {stage.tree}", ""], self._diff(file, os.path.join(stage.path, path))))
 
-    def cat(self, object: str) -> None:
+    def cat(self, object: str, pretty: bool = False) -> None:
         """Provide contents or details of repository objects.
 
         Args:
-            object (str): The name of the object to show.
+            object (str): The name of the object to show, or an abbreviation of a comment or test of the stage.
+            pretty (bool): Pretty-print tree and commit objects.
         """
-        print(self._blob_repo.load(object))
+        content = self._blob_repo.load(object)
+        if content is None:
+            stage = self._stage_repo.load()
+            found = self._find_object(stage, object) if stage is not None else None
+            if found is not None:
+                content = self._blob_repo.load(found[0].digest)
+        if content is not None and pretty:
+            try:
+                content = json.dumps(decode_object(content), indent=4)
+            except ValueError:
+                pass
+        print(content)
+
+    def pack(self) -> None:
+        """Pack the loose objects.
+
+        All the loose objects of the repository are appended to a single pack file indexed by digest, then removed.
+        Objects written afterwards stay loose until the next pack.
+        """
+        count = ObjectRepository().pack()
+        print(f"{count} objects packed")
 
-    def add(self, src_path: str):
+    def add(self, src_path: str, jobs: int = 1, shard: str | None = None, queue: bool = False):
         """Add file contents to the index.
 
         This command updates the index using the current content found in the working tree, to prepare the content
@@ -99,19 +164,43 @@ class DefaultOp:
 
         Args:
             src_path (str): Files to add content from.
+            jobs (int): Number of processes hashing and parsing the files in parallel.
+            shard (str): Add only the files of the shard i of n, such as "2/8", to a partial stage. The stages of all
+                the shards are combined with 'prose stage combine'.
+            queue (bool): Queue the LLM requests in .prose/queue.db for 'prose worker', then add once they are all
+                completed.
         """
-        tree_root = TreeWriter(self._config, self._parser, self._llm).write(src_path)
+        from prose.tree.tree_writer import TreeWriter
+        shard_range = parse_shard(shard) if shard is not None else None
+        if queue:
+            from prose.tree.tree_planner import TreePlanner
+            missing, queued = TreePlanner(self._config, self._get_parser(), self._get_llm_chat()).plan(
+                src_path, shard_range
+            )
+            if missing > 0:
+                return die(
+                    f"{missing} LLM requests waiting in .prose/queue.db, {queued} queued. "
+                    "Run 'prose worker', then add again."
+                )
+
+        tree_root = TreeWriter(self._config, self._get_parser(), self._get_llm()).write(src_path, jobs, shard_range)
+        # The results are in the trees now, an add interrupted from here on does not need the journal anymore
+        JournalRepository().clear()
+        LLMCacheRepository().prune(self._config.llm_cache_max_size)
         if tree_root is None:
             return die("No files to add.")
 
-        changes = []
-        def collect_change(file: Tree, path: str) -> None:
-            changes.append(file.digest)
-        TreeWalker(self._config).walk(tree_root, collect_change)
+        if shard is not None:
+            # A partial stage is neither indexed nor checked, the combined stage is
+            self._stage_repo.save(Stage(tree_root, src_path, str(shard)))
+            print(f"stage {tree_root} shard {shard}")
+            return
 
-        if len(changes) > 0:
+        object_index = self._build_object_index(tree_root)
+        if len(object_index.objects) > 0:
             stage = Stage(tree_root, src_path)
             self._stage_repo.save(stage)
+            self._object_index_repo.save(object_index)
         else:
             stage = self._stage_repo.load()
             if stage is None:
@@ -126,6 +215,80 @@ class DefaultOp:
         if commit is None or commit.tree != stage.tree:
             panic("There are some undocumented or untested code.")
 
+    def check(self, src_path: str = ".", jobs: int = 1) -> None:
+        """Check that all the classes and methods of a source tree are documented and tested, without querying the LLM.
+
+        The files are hashed, using the stat cache left by add, and the ones merged by the last commit are skipped. The
+        others are parsed, and their comments and the calls of their methods in the tests are looked up in the sources.
+        The classes and methods missing a comment or tests are printed as JSON, and the command fails if there are any.
+
+        Args:
+            src_path (str): Files to check.
+            jobs (int): Number of processes hashing and parsing the files in parallel.
+        """
+        from prose.tree.tree_checker import TreeChecker
+        commit = self._load_head_commit()
+        files, offenses = TreeChecker(self._config, self._get_parser()).check(src_path, commit, jobs)
+
+        print(
+            json.dumps(
+                {
+                    "commit": self._ref_repo.load(self._config.branch) if commit is not None else None,
+                    "files": files,
+                    "offenses": offenses,
+                },
+                indent=4,
+            )
+        )
+        if len(offenses) > 0:
+            panic(f"There are {len(offenses)} undocumented or untested classes or methods.")
+
+    def worker(self, lease: float = 300, max_attempts: int = 3, poll: float = 1) -> None:
+        """Complete the LLM requests queued by 'add --queue'.
+
+        Several workers can run at once, on the same .prose directory. Each request is leased to a worker, and leased
+        again to another one if the worker does not complete it in time. A failed request is retried up to the maximum
+        number of attempts. The worker stops once no request is pending or leased.
+
+        Args:
+            lease (float): Seconds a worker has to complete a request.
+            max_attempts (int): Number of attempts of a request before it fails.
+            poll (float): Seconds to wait for the requests leased by the other workers.
+        """
+        from prose.dao.blob.queue_repository import QueueRepository
+        llm = self._get_llm_chat()
+        queue_repo = QueueRepository()
+        name = f"{socket.gethostname()}:{os.getpid()}"
+
+        done, failed = 0, 0
+        while True:
+            job = queue_repo.claim(name, lease)
+            if job is None:
+                # A lease expiring after the claim counts as pending, to be claimed on the next round
+                stats = queue_repo.stats()
+                if stats.get("pending", 0) == 0 and stats.get("leased", 0) == 0:
+                    break
+                time.sleep(poll)
+                continue
+
+            try:
+                if llm.complete(job.prompt, job.kind) is not None:
+                    queue_repo.complete(job, name)
+                    done += 1
+                    continue
+                error, attempts = "I/O Error: Could not retreive LLM response", max_attempts
+            except TransientError as e:
+                error, attempts = f"I/O Error: {e}", max_attempts
+            except LLMError as e:
+                error, attempts = f"LLM Error: {e}", job.attempts
+            queue_repo.fail(job, name, error, attempts)
+            failed += 1
+            print(f"{job.target} {job.kind}: {error} (attempt {job.attempts})")
+
+        print(f"{done} requests completed, {failed} failed")
+        for target, error in queue_repo.errors():
+            print(f"Failed: {target}: {error}")
+
     def merge(self) -> None:
         """Merge a source tree back to the original locations.
         """
@@ -146,6 +309,8 @@ class DefaultOp:
         stage = self._stage_repo.load()
         if stage is None:
             return die("No files staged.")
+        if stage.shard is not None:
+            return panic(f"The stage is the shard {stage.shard}, combine the shards first.")
 
         parent = self._ref_repo.load(self._config.branch)
         if parent is not None:
@@ -160,46 +325,187 @@ class DefaultOp:
         commit_digest = self._commit_repo.save(commit_content)
         self._ref_repo.save(self._config.branch, commit_digest)
 
-    def _diff(self, comment_or_test: Tree, path: str) -> list[str]:
+    def _load_head_commit(self) -> Commit | None:
+        ref = self._ref_repo.load(self._config.branch)
+        if ref is None:
+            return None
+        return self._commit_repo.load(ref)
+
+    def _resolve_tree(self, name: str) -> tuple[str, str | None] | None:
+        # The tree and the source path it was added from, unknown for a bare tree
+        if name == "stage":
+            stage = self._stage_repo.load()
+            return (stage.tree, stage.path) if stage is not None else None
+
+        if name == "HEAD":
+            commit = self._load_head_commit()
+            return (commit.tree, commit.path) if commit is not None else None
+
+        ref = self._ref_repo.load(name)
+        commit = self._commit_repo.load(ref or name)
+        if commit is not None:
+            return commit.tree, commit.path
+
+        if self._tree_repo.exists(name):
+            return name, None
+
+    def _filter_deleted(self, changes: Iterable[TreeChange], src_path: str) -> Iterator[TreeChange]:
+        # A tree only holds the files of its add: a file left out by a later add is unchanged, not deleted
+        for change in changes:
+            status, old_file, _, path = change
+            if (
+                status == TREE_DELETED
+                and old_file is not None
+                and self._has_source(old_file, os.path.join(src_path, path))
+            ):
+                continue
+            yield change
+
+    def _has_source(self, comment_or_test: Tree, path: str) -> bool:
+        name = comment_or_test.name
+        if comment_or_test.type == "test":
+            name = name.removeprefix("Test")
+        return os.path.exists(os.path.join(self._config.base_path, path, name))
+
+    def _get_parser(self) -> ParserBase:
+        if self._parser is None:
+            from prose.parser.java.parser_java import ParserJava
+            self._parser = ParserJava()
+        return self._parser
+
+    def _get_llm(self) -> LLMBase:
+        if self._llm is None:
+            from prose.llm.llm_factory import create_llm
+            self._llm = create_llm(self._config, self._get_parser())
+        return self._llm
+
+    def _get_llm_chat(self) -> LLMChat:
+        # The queue needs the cache and the completions of a chat backend
+        llm = self._get_llm()
+        if not isinstance(llm, LLMChat):
+            panic(f"The LLM backend '{self._config.llm_backend}' can not complete queued requests")
+        return cast(LLMChat, llm)
+
+    def _build_object_index(self, tree: str) -> ObjectIndex:
+        object_index = ObjectIndex(tree)
+        def index_object(file: Tree, path: str) -> None:
+            object_index.objects[file.digest] = [file.type, path, file.name]
+        TreeWalker(self._config).walk(tree, index_object)
+        object_index.objects = dict(sorted(object_index.objects.items()))
+        return object_index
+
+    def _find_object(self, stage: Stage, object: str) -> tuple[Tree, str] | None:
+        object_index = self._object_index_repo.load()
+        if object_index is None or object_index.tree != stage.tree:
+            object_index = self._build_object_index(stage.tree)
+            self._object_index_repo.save(object_index)
+
+        entry = object_index.objects.get(object)
+        if entry is None:
+            # The digests are stored sorted, so the ones starting with the abbreviation are contiguous
+            digests = list(object_index.objects)
+            i = bisect.bisect_left(digests, object)
+            matches = [digest for digest in digests[i : i + 2] if digest.startswith(object)]
+            if len(matches) > 1:
+                return panic(f"Ambiguous object '{object}'")
+            if len(matches) == 0:
+                return None
+            object = matches[0]
+            entry = object_index.objects[object]
+
+        type, path, name = entry
+        return Tree(type, object, name), path
+
+    def _status(self, stage: Stage, all: bool, name_only: bool, stat: bool) -> Iterator[str]:
+        if not name_only:
+            yield f"stage {stage.tree}"
+            yield ""
+
+        commit = self._load_head_commit()
+        if all or commit is None:
+            changes = (
+                (TREE_ADDED, None, file, path) for file, path in TreeWalker(self._config).iter(stage.tree)
+            )
+        else:
+            changes = self._filter_deleted(TreeDiffer(self._config).iter(commit.tree, stage.tree), stage.path)
+
+        files, insertions, deletions = 0, 0, 0
+        for _, old_file, new_file, path in changes:
+            path = os.path.join(stage.path, path)
+            if name_only or stat:
+                file = new_file or old_file
+                assert file is not None
+                original_path = self._get_original_path(file, path)
+                if name_only:
+                    yield original_path
+                elif new_file is None:
+                    yield f" {original_path} | deleted"
+                else:
+                    added, removed = self._diff_stat(new_file, original_path)
+                    files, insertions, deletions = files + 1, insertions + added, deletions + removed
+                    yield f" {original_path} | +{added} -{removed}"
+            elif new_file is not None:
+                yield from self._diff(new_file, path)
+            elif old_file is not None:
+                yield f"{old_file.type} {old_file.digest}"
+                yield f"Deleted: {os.path.join(path, old_file.name)}"
+                yield ""
+
+        if stat:
+            yield f" {files} files changed, {insertions} insertions(+), {deletions} deletions(-)"
+
+    def _get_original_path(self, comment_or_test: Tree, path: str) -> str:
+        original_path = os.path.join(self._config.base_path, path, comment_or_test.name)
+        if comment_or_test.type == "test":
+            original_path = original_path.replace("main", "test")
+        return original_path
+
+    def _load_lines(self, comment_or_test: Tree, original_path: str) -> tuple[list[str], list[str]]:
         blob_content = self._blob_repo.load(comment_or_test.digest)
         if blob_content is not None:
             comment_or_test_content = blob_content.splitlines()
         else:
             comment_or_test_content = []
 
-        original_path = os.path.join(self._config.base_path, path, comment_or_test.name)
-        if comment_or_test.type == "test":
-            original_path = original_path.replace("main", "test")
         if os.path.exists(original_path):
             with open(original_path, "r") as f:
                 original_content = f.read().splitlines()
         else:
             original_content = []
 
-        output = [
-            f"{comment_or_test.type} {comment_or_test.digest}",
-            f"Path: {original_path}",
-            ""
-        ]
-        for line in difflib.unified_diff(
+        return original_content, comment_or_test_content
+
+    def _diff(self, comment_or_test: Tree, path: str) -> Iterator[str]:
+        original_path = self._get_original_path(comment_or_test, path)
+        original_content, comment_or_test_content = self._load_lines(comment_or_test, original_path)
+
+        yield f"{comment_or_test.type} {comment_or_test.digest}"
+        yield f"Path: {original_path}"
+        yield ""
+        yield from difflib.unified_diff(
             original_content,
             comment_or_test_content,
             tofile=original_path,
             fromfile=comment_or_test.digest,
             lineterm="",
-        ):
-            output += [line]
-        output += [""]
-        return output
+        )
+        yield ""
+
+    def _diff_stat(self, comment_or_test: Tree, original_path: str) -> tuple[int, int]:
+        # Counts the lines present on one side only, without aligning the files as difflib would
+        original_content, comment_or_test_content = self._load_lines(comment_or_test, original_path)
+        original_lines = Counter(original_content)
+        comment_or_test_lines = Counter(comment_or_test_content)
+        added = sum((comment_or_test_lines - original_lines).values())
+        removed = sum((original_lines - comment_or_test_lines).values())
+        return added, removed
 
     def _rewrite_file(self, comment_or_test: Tree, path: str) -> None:
         blob_content = self._blob_repo.load(comment_or_test.digest)
         if blob_content is not None:
             comment_or_test_content = blob_content
 
-            original_path = os.path.join(self._config.base_path, path, comment_or_test.name)
-            if comment_or_test.type == "test":
-                original_path = original_path.replace("main", "test")
+            original_path = self._get_original_path(comment_or_test, path)
 
             original_parent_path = os.path.dirname(original_path)
             os.makedirs(original_parent_path, exist_ok=True)
@@ -8,6 +8,13 @@ from typing import Any
 class Config:
     base_path: str
     branch: str
+    llm_backend: str = "openai"
+    llm_fake_latency: float = 0
+    llm_cassette: str = ".prose/cassette.jsonl"
+    llm_max_in_flight: int = 1
+    llm_requests_per_minute: int = 0
+    llm_tokens_per_minute: int = 0
+    llm_cache_max_size: int = 256 * 1024 * 1024
 
     @staticmethod
     def of(data: dict) -> Config:
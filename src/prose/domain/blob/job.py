@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from typing import Any
+
+
+@dataclass
+class Job:
+    digest: str
+    kind: str
+    prompt: str
+    target: str
+    status: str = "pending"
+    attempts: int = 0
+
+    @staticmethod
+    def of(data: dict) -> Job:
+        return Job(**data)
+
+    def asdict(self) -> dict[str, Any]:
+        return asdict(self)
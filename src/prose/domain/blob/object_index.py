@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+
+@dataclass
+class ObjectIndex:
+    tree: str
+    objects: dict[str, list[str]] = field(default_factory=dict)
+
+    @staticmethod
+    def of(data: dict) -> ObjectIndex:
+        return ObjectIndex(**data)
+
+    def asdict(self) -> dict[str, Any]:
+        return asdict(self)
@@ -8,6 +8,7 @@ from typing import Any
 class Stage:
     tree: str
     path: str
+    shard: str | None = None
 
     @staticmethod
     def of(data: dict) -> Stage:
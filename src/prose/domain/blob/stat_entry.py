@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+import os
+from dataclasses import astuple, dataclass
+from typing import Any
+
+
+@dataclass
+class StatEntry:
+    mtime_ns: int
+    size: int
+    inode: int
+    digest: str
+
+    @staticmethod
+    def of(data: list) -> StatEntry:
+        return StatEntry(*data)
+
+    @staticmethod
+    def of_stat(stat: os.stat_result, digest: str) -> StatEntry:
+        return StatEntry(stat.st_mtime_ns, stat.st_size, stat.st_ino, digest)
+
+    def astuple(self) -> tuple[Any, ...]:
+        return astuple(self)
+
+    def matches(self, stat: os.stat_result) -> bool:
+        return (
+            self.mtime_ns == stat.st_mtime_ns
+            and self.size == stat.st_size
+            and self.inode == stat.st_ino
+        )
@@ -0,0 +1,52 @@
+from prose.dao.blob.cassette_repository import CassetteRepository
+from prose.llm.llm_chat import LLMChat, LLMError
+from prose.parser.parser_base import ParserBase
+from prose.util.util import get_digest_object
+
+CASSETTE_MODEL = "cassette"
+
+
+class LLMCassette(LLMChat):
+    """Records the transcripts of another backend into a cassette, or replays them without any network access.
+
+    With a backend, every response is queried and recorded; without, responses are replayed from the cassette and
+    a prompt that was never recorded is an error.
+    """
+
+    def __init__(
+        self,
+        parser: ParserBase,
+        cassette_repo: CassetteRepository,
+        backend: LLMChat | None = None,
+        max_in_flight: int = 1,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+    ):
+        super().__init__(parser, max_in_flight, requests_per_minute, tokens_per_minute)
+        self.cassette_repo = cassette_repo
+        self.backend = backend
+        if backend is not None:
+            # The rate limits reported to the backend throttle the requests this scheduler sends
+            backend.scheduler = self.scheduler
+
+    def get_model(self) -> str:
+        # Shared by recording and replaying, and distinct from the backend, so that cached responses of the backend
+        # are still recorded
+        return CASSETTE_MODEL
+
+    def _query(self, prompt: str, kind: str, temperature: float = 0) -> tuple[str | None, int]:
+        digest = get_digest_object([prompt, kind, temperature])
+
+        if self.backend is None:
+            record = self.cassette_repo.load(digest)
+            if record is None:
+                raise LLMError(f"No response recorded in '{self.cassette_repo.path}' for the prompt {digest}")
+            return record["response"], record["tokens"]
+
+        response, tokens = self.backend.query(prompt, kind, temperature)
+        if response is not None:
+            self.cassette_repo.save(
+                digest,
+                {"kind": kind, "prompt": prompt, "response": response, "tokens": tokens},
+            )
+        return response, tokens
@@ -0,0 +1,60 @@
+import time
+
+from prose.llm.llm_chat import LLM_CLASS_COMMENT, LLM_METHOD_COMMENT, LLM_METHOD_TESTS, LLMChat
+from prose.parser.parser_base import ParserBase
+from prose.util.util import get_digest_string
+
+FAKE_MODEL = "fake"
+
+FAKE_CLASS_COMMENT = """/**
+ * Generated documentation {digest} of the class.
+ */"""
+
+FAKE_METHOD_COMMENT = """/**
+ * Generated documentation {digest} of the method.
+ *
+ * @return the result of the method
+ */"""
+
+FAKE_METHOD_TESTS = """@Test
+public void testGenerated{digest}() {{
+    assertTrue(true);
+}}
+"""
+
+
+class LLMFake(LLMChat):
+    """Offline backend answering well-formed JAVADOC comments and JUNIT tests after a synthetic latency.
+
+    The responses only depend on the prompt, so runs are reproducible.
+    """
+
+    def __init__(
+        self,
+        parser: ParserBase,
+        max_in_flight: int = 1,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+        latency: float = 0,
+    ):
+        super().__init__(parser, max_in_flight, requests_per_minute, tokens_per_minute)
+        self.latency = latency
+
+    def get_model(self) -> str:
+        return FAKE_MODEL
+
+    def _query(self, prompt: str, kind: str, temperature: float = 0) -> tuple[str | None, int]:
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+        digest = get_digest_string(prompt)[:12]
+        if kind == LLM_CLASS_COMMENT:
+            response = FAKE_CLASS_COMMENT.format(digest=digest)
+        elif kind == LLM_METHOD_COMMENT:
+            response = FAKE_METHOD_COMMENT.format(digest=digest)
+        elif kind == LLM_METHOD_TESTS:
+            response = FAKE_METHOD_TESTS.format(digest=digest)
+        else:
+            response = None
+
+        return response, (len(prompt) + len(response or "")) // 4
@@ -6,6 +6,9 @@ from prose.domain.code.method import Method
 
 
 class LLMBase:
+    def get_max_in_flight(self) -> int:
+        return 1
+
     def commentify_class(self, clazz: Class) -> None:
         pass
 
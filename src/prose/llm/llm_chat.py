@@ -0,0 +1,196 @@
+from typing import Callable
+
+from prose.dao.blob.llm_cache_repository import LLMCacheRepository
+from prose.domain.code.clazz import Class
+from prose.domain.code.method import Method
+from prose.domain.code.test import Test
+from prose.llm.llm_base import LLMBase
+from prose.llm.scheduler import RateScheduler, TransientError
+from prose.parser.parser_base import ParserBase
+from prose.util.profiler import PROFILER
+from prose.util.util import get_digest_object, panic
+
+LLM_CLASS_COMMENT = "class_comment"
+LLM_METHOD_COMMENT = "method_comment"
+LLM_METHOD_TESTS = "method_tests"
+
+LLM_SYSTEM_MESSAGE = "You are a programmer to comment and test your code."
+LLM_COMPLETION_TOKENS = 1024
+
+
+class LLMError(Exception):
+    pass
+
+
+class LLMChat(LLMBase):
+    """Base of the chat backends: builds the prompts with the parser, validates and cleans up the responses.
+
+    Backends only implement _query. Responses are looked up in the cache first, and requests go through the rate
+    scheduler.
+    """
+
+    def __init__(
+        self,
+        parser: ParserBase,
+        max_in_flight: int = 1,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+    ):
+        self.parser = parser
+        self.max_in_flight = max(1, max_in_flight)
+        self.cache_repo = LLMCacheRepository()
+        self.scheduler = RateScheduler(requests_per_minute, tokens_per_minute)
+
+    def get_max_in_flight(self) -> int:
+        return self.max_in_flight
+
+    def get_model(self) -> str:
+        return ""
+
+    def commentify_class(self, clazz: Class) -> None:
+        prompt = self.parser.get_prompt_class_comment(clazz)
+        if prompt is None:
+            return
+
+        comment = self._query_valid(prompt, LLM_CLASS_COMMENT, self.parser.is_valid_class_comment)
+        if comment is None:
+            return
+
+        clazz.has_llm_comment = True
+        clazz.comment = self.parser.cleanup_class_comment(comment)
+
+    def commentify_method(self, method: Method) -> None:
+        prompt = self.parser.get_prompt_method_comment(method)
+        if prompt is None:
+            return
+
+        comment = self._query_valid(prompt, LLM_METHOD_COMMENT, self.parser.is_valid_method_comment)
+        if comment is None:
+            return
+
+        method.has_llm_comment = True
+        method.comment = self.parser.cleanup_method_comment(comment)
+
+    def testify_method(self, method: Method) -> None:
+        prompt = self.parser.get_prompt_method_tests(method)
+        if prompt is None:
+            return
+
+        tests = self._query_valid(prompt, LLM_METHOD_TESTS, self.parser.is_valid_method_tests)
+        if tests is None:
+            return
+
+        tests = self.parser.cleanup_method_tests(tests)
+        if tests is None:
+            return
+
+        method.has_llm_tests = True
+        method.tests = [
+            Test("\n".join(declaration), decorator + declaration + body)
+            for decorator, declaration, body in tests
+        ]
+
+    def get_cache_digest(self, prompt: str, temperature: float = 0) -> str:
+        return get_digest_object([self.get_model(), LLM_SYSTEM_MESSAGE, prompt, temperature])
+
+    def is_cached(self, prompt: str, kind: str) -> bool:
+        """Tells whether a valid response to a prompt is in the cache.
+        """
+        response = self.cache_repo.load(self.get_cache_digest(prompt))
+        return response is not None and self._get_validator(kind)(response)
+
+    def complete(self, prompt: str, kind: str) -> str | None:
+        """Queries a prompt until the response is valid, and caches it.
+
+        Args:
+            prompt (str): The prompt.
+            kind (str): What the prompt asks for: LLM_CLASS_COMMENT, LLM_METHOD_COMMENT or LLM_METHOD_TESTS.
+
+        Returns:
+            The response, or None if the backend did not respond.
+
+        Raises:
+            TransientError: If the request may succeed when retried.
+            LLMError: If the request can not succeed.
+        """
+        return self._query_cached(prompt, kind, self._get_validator(kind))
+
+    def query(self, prompt: str, kind: str, temperature: float = 0) -> tuple[str | None, int]:
+        """Sends a prompt to the model once, bypassing the cache and the scheduler, for a backend wrapping this one.
+
+        The rate limits reported by the server still update the scheduler, which the wrapping backend should share.
+        """
+        return self._query(prompt, kind, temperature)
+
+    def _get_validator(self, kind: str) -> Callable[[str], bool]:
+        if kind == LLM_CLASS_COMMENT:
+            return self.parser.is_valid_class_comment
+        if kind == LLM_METHOD_COMMENT:
+            return self.parser.is_valid_method_comment
+        if kind == LLM_METHOD_TESTS:
+            return self.parser.is_valid_method_tests
+        raise LLMError(f"Unknown kind of prompt '{kind}'")
+
+    def _query_valid(
+        self, prompt: str, kind: str, is_valid: Callable[[str], bool], temperature: float = 0
+    ) -> str | None:
+        try:
+            response = self._query_cached(prompt, kind, is_valid, temperature)
+        except TransientError as e:
+            return panic(f"I/O Error: Could not retreive LLM response, abort! ({e})")
+        except LLMError as e:
+            return panic(f"LLM Error: {e}")
+        if response is None:
+            return panic("I/O Error: Could not retreive LLM response, abort!")
+        return response
+
+    def _query_cached(
+        self, prompt: str, kind: str, is_valid: Callable[[str], bool], temperature: float = 0
+    ) -> str | None:
+        cache_digest = self.get_cache_digest(prompt, temperature)
+        response = self.cache_repo.load(cache_digest)
+        if response is not None and is_valid(response):
+            PROFILER.count("llm_cache_hits")
+            return response
+        PROFILER.count("llm_cache_misses")
+
+        while True:
+            with PROFILER.span(kind, "llm", stage=True, model=self.get_model()) as span:
+                response = self.scheduler.run(
+                    lambda: self._query_traced(prompt, kind, temperature, span),
+                    len(prompt) // 4 + LLM_COMPLETION_TOKENS,
+                )
+            if response is None:
+                return None
+
+            if is_valid(response):
+                break
+
+        self.cache_repo.save(cache_digest, response)
+        return response
+
+    def _query_traced(
+        self, prompt: str, kind: str, temperature: float, span: dict
+    ) -> tuple[str | None, int]:
+        response, tokens = self._query(prompt, kind, temperature)
+        span["attempts"] = span.get("attempts", 0) + 1
+        span["tokens"] = span.get("tokens", 0) + tokens
+        PROFILER.count("llm_tokens", tokens)
+        return response, tokens
+
+    def _query(self, prompt: str, kind: str, temperature: float = 0) -> tuple[str | None, int]:
+        """Sends a prompt to the model.
+
+        Args:
+            prompt (str): The prompt.
+            kind (str): What the prompt asks for: LLM_CLASS_COMMENT, LLM_METHOD_COMMENT or LLM_METHOD_TESTS.
+            temperature (float): The sampling temperature.
+
+        Returns:
+            The response and the number of tokens used.
+
+        Raises:
+            TransientError: If the request may succeed when retried.
+            LLMError: If the request can not succeed.
+        """
+        return None, 0
@@ -0,0 +1,45 @@
+from prose.domain.blob.config import Config
+from prose.llm.llm_base import LLMBase
+from prose.parser.parser_base import ParserBase
+from prose.util.util import panic
+
+LLM_BACKENDS = ["openai", "fake", "record", "replay"]
+
+
+def create_llm(config: Config, parser: ParserBase) -> LLMBase:
+    """Creates the LLM backend selected by the configuration.
+
+    Backends are imported on demand, so that the offline ones do not require the OpenAI client.
+
+    Args:
+        config (Config): The configuration.
+        parser (ParserBase): The parser building the prompts.
+
+    Returns:
+        The LLM backend
+    """
+    limits = (
+        config.llm_max_in_flight,
+        config.llm_requests_per_minute,
+        config.llm_tokens_per_minute,
+    )
+
+    if config.llm_backend == "openai":
+        from prose.llm.openai.llm_openai import LLMOpenAI
+        return LLMOpenAI(parser, *limits)
+
+    if config.llm_backend == "fake":
+        from prose.llm.fake.llm_fake import LLMFake
+        return LLMFake(parser, *limits, latency=config.llm_fake_latency)
+
+    if config.llm_backend in ["record", "replay"]:
+        from prose.dao.blob.cassette_repository import CassetteRepository
+        from prose.llm.cassette.llm_cassette import LLMCassette
+        backend = None
+        if config.llm_backend == "record":
+            from prose.llm.openai.llm_openai import LLMOpenAI
+            backend = LLMOpenAI(parser, *limits)
+        return LLMCassette(parser, CassetteRepository(config.llm_cassette), backend, *limits)
+
+    panic(f"Unknown LLM backend '{config.llm_backend}', expected one of {', '.join(LLM_BACKENDS)}")
+    return LLMBase()
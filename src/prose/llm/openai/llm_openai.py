@@ -1,85 +1,53 @@
+import openai
 from openai import OpenAI
-from prose.domain.code.test import Test
 
-from prose.llm.llm_base import LLMBase
+from prose.llm.llm_chat import LLM_SYSTEM_MESSAGE, LLMChat, LLMError
+from prose.llm.scheduler import TransientError, parse_retry_after
 from prose.parser.parser_base import ParserBase
-from prose.domain.code.clazz import Class
-from prose.domain.code.method import Method
-
-from prose.util.util import panic, retry
 
 OPENAI_ENGINE = "chat_gpt"
-
-
-class LLMOpenAI(LLMBase):
-    def __init__(self, parser: ParserBase):
-        self.client = OpenAI()
-        self.parser = parser
-
-    def commentify_class(self, clazz: Class) -> None:
-        prompt = self.parser.get_prompt_class_comment(clazz)
-        if prompt is None:
-            return
-
-        while True:
-            comment = retry(self._query, prompt)
-            if comment is None:
-                return panic("I/O Error: Could not retreive OpenAI response, abort!")
-
-            if self.parser.is_valid_class_comment(comment):
-                break
-
-        clazz.has_llm_comment = True
-        clazz.comment = self.parser.cleanup_class_comment(comment)
-
-    def commentify_method(self, method: Method) -> None:
-        prompt = self.parser.get_prompt_method_comment(method)
-        if prompt is None:
-            return
-
-        while True:
-            comment = retry(self._query, prompt)
-            if comment is None:
-                return panic("I/O Error: Could not retreive OpenAI response, abort!")
-
-            if self.parser.is_valid_method_comment(comment):
-                break
-
-        method.has_llm_comment = True
-        method.comment = self.parser.cleanup_method_comment(comment)
-
-    def testify_method(self, method: Method) -> None:
-        prompt = self.parser.get_prompt_method_tests(method)
-        if prompt is None:
-            return
-
-        while True:
-            tests = retry(self._query, prompt)
-            if tests is None:
-                return panic("I/O Error: Could not retreive OpenAI response, abort!")
-
-            if self.parser.is_valid_method_tests(tests):
-                break
-
-        tests = self.parser.cleanup_method_tests(tests)
-        if tests is None:
-            return
-
-        method.has_llm_tests = True
-        method.tests = [
-            Test("\n".join(declaration), decorator + declaration + body)
-            for decorator, declaration, body in tests
-        ]
-
-    def _query(self, prompt: str, temperature: float = 0) -> str | None:
-        completion = self.client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a programmer to comment and test your code.",
-                },
-                {"role": "user", "content": prompt},
-            ],
-        )
-        return completion.choices[0].message.content
+OPENAI_MODEL = "gpt-3.5-turbo"
+OPENAI_TRANSIENT_STATUS_CODES = [408, 409, 429]
+
+
+class LLMOpenAI(LLMChat):
+    def __init__(
+        self,
+        parser: ParserBase,
+        max_in_flight: int = 1,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+    ):
+        super().__init__(parser, max_in_flight, requests_per_minute, tokens_per_minute)
+        # Retries are left to the scheduler, which shares the rate limits between the threads
+        self.client = OpenAI(max_retries=0)
+
+    def get_model(self) -> str:
+        return OPENAI_MODEL
+
+    def _query(self, prompt: str, kind: str, temperature: float = 0) -> tuple[str | None, int]:
+        try:
+            raw_completion = self.client.chat.completions.with_raw_response.create(
+                model=OPENAI_MODEL,
+                messages=[
+                    {
+                        "role": "system",
+                        "content": LLM_SYSTEM_MESSAGE,
+                    },
+                    {"role": "user", "content": prompt},
+                ],
+            )
+        except openai.APIConnectionError as e:
+            raise TransientError(str(e)) from e
+        except openai.APIStatusError as e:
+            if e.status_code in OPENAI_TRANSIENT_STATUS_CODES or e.status_code >= 500:
+                self.scheduler.update(e.response.headers)
+                raise TransientError(str(e), parse_retry_after(e.response.headers)) from e
+            raise LLMError(str(e)) from e
+        except openai.OpenAIError as e:
+            raise LLMError(str(e)) from e
+
+        self.scheduler.update(raw_completion.headers)
+        completion = raw_completion.parse()
+        used_tokens = completion.usage.total_tokens if completion.usage is not None else 0
+        return completion.choices[0].message.content, used_tokens
@@ -0,0 +1,201 @@
+import email.utils
+import random
+import re
+import time
+from threading import Lock
+from typing import Callable, Mapping, TypeVar
+
+T = TypeVar("T")
+
+SCHEDULER_MAX_RETRIES = 6
+SCHEDULER_BASE_DELAY = 1.0
+SCHEDULER_MAX_DELAY = 60.0
+SCHEDULER_BURST_SECONDS = 10.0
+
+DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+class TransientError(Exception):
+    """An error worth retrying, such as a rate limit or a server error.
+
+    Args:
+        message (str): The error message.
+        retry_after (float | None): The delay in seconds requested by the server, if any.
+    """
+
+    def __init__(self, message: str, retry_after: float | None = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """A token bucket refilled continuously at a given rate per minute. A rate of 0 means no limit.
+
+    Quotas such as Azure OpenAI's are enforced over short windows, so the bucket only holds a few seconds of quota
+    instead of a whole minute.
+    """
+
+    def __init__(self, rate_per_minute: int, burst_seconds: float = SCHEDULER_BURST_SECONDS):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds) if rate_per_minute > 0 else 0.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def is_unlimited(self) -> bool:
+        return self.rate <= 0
+
+    def reserve(self, amount: float) -> float:
+        """Takes the tokens if available, otherwise returns the time to wait before trying again.
+        """
+        if self.is_unlimited():
+            return 0
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            self.tokens -= amount
+            return 0
+        return (amount - self.tokens) / self.rate
+
+    def adjust(self, amount: float) -> None:
+        if not self.is_unlimited():
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+    def drain(self, remaining: float) -> None:
+        if not self.is_unlimited():
+            self._refill()
+            self.tokens = min(self.tokens, remaining)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+
+class RateScheduler:
+    """Schedules the requests of all the threads within requests-per-minute and tokens-per-minute quotas.
+
+    Transient errors are retried with an exponential backoff with jitter, or after the delay requested by the
+    server, during which no other request is sent. Any other error is raised at once.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+        max_retries: int = SCHEDULER_MAX_RETRIES,
+    ):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_retries = max_retries
+        self.paused_until = 0.0
+        self.lock = Lock()
+
+    def run(self, func: Callable[[], tuple[T, int]], tokens: int) -> T:
+        """Runs a request once the quotas allow it, retrying on transient errors.
+
+        Args:
+            func (Callable[[], tuple[T, int]]): The request, returning its result and the tokens it really used.
+            tokens (int): The estimated number of tokens of the request.
+
+        Returns:
+            The result of the request.
+        """
+        attempt = 0
+        while True:
+            self._acquire(tokens)
+            try:
+                result, used_tokens = func()
+            except TransientError as e:
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise
+                self._backoff(attempt, e.retry_after)
+                continue
+
+            with self.lock:
+                self.tokens.adjust(tokens - used_tokens)
+            return result
+
+    def update(self, headers: Mapping[str, str]) -> None:
+        """Aligns the buckets with the x-ratelimit-* headers of a response.
+        """
+        remaining_requests = parse_number(headers.get("x-ratelimit-remaining-requests"))
+        remaining_tokens = parse_number(headers.get("x-ratelimit-remaining-tokens"))
+        with self.lock:
+            if remaining_requests is not None:
+                self.requests.drain(remaining_requests)
+                if remaining_requests <= 0:
+                    self._pause(parse_duration(headers.get("x-ratelimit-reset-requests")))
+            if remaining_tokens is not None:
+                self.tokens.drain(remaining_tokens)
+                if remaining_tokens <= 0:
+                    self._pause(parse_duration(headers.get("x-ratelimit-reset-tokens")))
+
+    def _acquire(self, tokens: int) -> None:
+        while True:
+            with self.lock:
+                delay = self.paused_until - time.monotonic()
+                if delay <= 0:
+                    delay = self.requests.reserve(1)
+                    if delay <= 0:
+                        delay = self.tokens.reserve(tokens)
+                        if delay <= 0:
+                            return
+                        self.requests.adjust(1)
+            time.sleep(delay)
+
+    def _backoff(self, attempt: int, retry_after: float | None) -> None:
+        if retry_after is not None:
+            with self.lock:
+                self._pause(retry_after)
+        else:
+            delay = min(SCHEDULER_MAX_DELAY, SCHEDULER_BASE_DELAY * 2 ** (attempt - 1))
+            time.sleep(random.uniform(delay / 2, delay))
+
+    def _pause(self, delay: float | None) -> None:
+        if delay is not None and delay > 0:
+            self.paused_until = max(self.paused_until, time.monotonic() + delay)
+
+
+def parse_number(value: str | None) -> float | None:
+    """Returns the number of a header value, or None if missing or malformed.
+    """
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def parse_duration(value: str | None) -> float | None:
+    """Returns the seconds of a duration header value such as "20ms", "1s" or "6m0s".
+    """
+    if value is None:
+        return None
+    seconds = parse_number(value)
+    if seconds is not None:
+        return seconds
+    parts = DURATION_PART.findall(value)
+    if len(parts) == 0:
+        return None
+    return sum(float(number) * DURATION_UNITS[unit] for number, unit in parts)
+
+
+def parse_retry_after(headers: Mapping[str, str]) -> float | None:
+    """Returns the delay in seconds of the retry-after-ms or retry-after headers (seconds or HTTP date).
+    """
+    retry_after_ms = parse_number(headers.get("retry-after-ms"))
+    if retry_after_ms is not None:
+        return retry_after_ms / 1000.0
+
+    retry_after = headers.get("retry-after")
+    if retry_after is None:
+        return None
+    seconds = parse_number(retry_after)
+    if seconds is not None:
+        return seconds
+    try:
+        return email.utils.parsedate_to_datetime(retry_after).timestamp() - time.time()
+    except (TypeError, ValueError):
+        return None
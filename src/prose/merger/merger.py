@@ -8,9 +8,10 @@ class Merger:
         else:
             self.src_lines = path_or_lines
 
-        self.mapper = {}
-        for i in range(0, len(self.src_lines)):
-            self.mapper[i] = i
+        # Lines to insert before each source line, in merge order. They are applied in a single pass when the text is
+        # needed, instead of shifting the source lines on every merge.
+        self.insertions: dict[int, list[str]] = {}
+        self.merged_lines: list[str] | None = self.src_lines
 
         self.num = len(self.src_lines)
 
@@ -21,30 +22,38 @@ class Merger:
         return self.num
 
     def get_text(self):
-        return "".join(self.src_lines)
+        return "".join(self._get_merged_lines())
 
     def find(self, text: str) -> tuple[int, int] | None:
         num_line = 0
-        for line in self.src_lines:
+        for line in self._get_merged_lines():
             if text in line:
                 return (num_line, line.find(text))
             num_line += 1
 
     def find_last(self, text: str) -> tuple[int, int] | None:
         num_line = self.num - 1
-        for line in reversed(self.src_lines):
+        for line in reversed(self._get_merged_lines()):
             if text in line:
                 return (num_line, line.find(text))
             num_line -= 1
 
     def merge(self, start_point: tuple[int, int], text: list[str]) -> None:
         line_num = start_point[0]
+        if line_num < 0 or line_num >= self.num:
+            raise KeyError(line_num)
         spaces = " " * start_point[1]
-        for line in text:
-            self.src_lines.insert(self.mapper[line_num], spaces + line + "\n")
-            for k, v in self.mapper.items():
-                if k >= line_num:
-                    self.mapper[k] = v + 1
+        self.insertions.setdefault(line_num, []).extend(spaces + line + "\n" for line in text)
+        self.merged_lines = None
         self.modified = True
 
-
+    def _get_merged_lines(self) -> list[str]:
+        if self.merged_lines is None:
+            merged_lines = []
+            for line_num, line in enumerate(self.src_lines):
+                inserted_lines = self.insertions.get(line_num)
+                if inserted_lines is not None:
+                    merged_lines.extend(inserted_lines)
+                merged_lines.append(line)
+            self.merged_lines = merged_lines
+        return self.merged_lines
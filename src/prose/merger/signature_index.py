@@ -0,0 +1,51 @@
+import re
+
+from prose.merger.merger import Merger
+
+SIGNATURE_NAME_PATTERN = re.compile(r"(\w+)\s*\(")
+
+
+def get_signature_key(text: str) -> str:
+    """Returns the declaration part of a line or a signature (before any opening brace), whitespace collapsed.
+
+    Args:
+        text (str): The line or the signature.
+
+    Returns:
+        The key of the signature
+    """
+    return " ".join(text.split("{", 1)[0].split())
+
+
+class SignatureIndex:
+    """Index of the signatures declared in a merged file, with a stable anchor before which new code is inserted.
+
+    A signature is declared if a line of the file contains it, as Merger.find tells, so that a declaration with a
+    throws clause or an annotation on the same line still matches. The file is scanned once, and the lines are indexed
+    by the names they call or declare, so that looking up and placing each new test only reads the lines of its name.
+    """
+
+    def __init__(self, merger: Merger, end_of_code: str):
+        self.merger = merger
+        self.lines: dict[str, list[str]] = {}
+        for line in merger.src_lines:
+            self._add(" ".join(line.split()))
+        self.anchor = merger.find_last(end_of_code)
+
+    def contains(self, signature: str) -> bool:
+        key = get_signature_key(signature)
+        match = SIGNATURE_NAME_PATTERN.search(key)
+        if match is None:
+            return any(key in line for lines in self.lines.values() for line in lines)
+        return any(key in line for line in self.lines.get(match.group(1), []))
+
+    def insert(self, signature: str, code: list[str], column: int) -> bool:
+        if self.anchor is None or self.contains(signature):
+            return False
+        self.merger.merge((self.anchor[0], column), code)
+        self._add(get_signature_key(signature))
+        return True
+
+    def _add(self, line: str) -> None:
+        for name in set(SIGNATURE_NAME_PATTERN.findall(line)):
+            self.lines.setdefault(name, []).append(line)
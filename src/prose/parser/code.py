@@ -1,65 +1,151 @@
-from io import StringIO
+import re
+from functools import lru_cache
 
 from prose.domain.code.file import File
-from prose.util.util import panic
+from prose.util.util import panic, read_file
 
 
 class Code:
-    def __init__(self, file: File):
+    """The source of a file, read once and shared by the hashing, the parsing and the storage of the file.
+
+    The source is kept as a single buffer with the offset of the start of each line, so that a span given as
+    tree-sitter (row, byte column) points or as byte offsets is a single slice. Only the slices are decoded.
+    """
+
+    def __init__(self, file: File, src: bytes | None = None):
         self.file = file
-        self.src_lines: list[str] | None = None
+        self.src: bytes | None = None
+        self.line_starts: list[int] = []
+        if src is not None:
+            self._set_src(src)
 
     def load(self) -> None:
+        if self.src is not None:
+            return
         try:
-            with open(self.file.path, "r") as f:
-                self.src_lines = f.readlines()
+            self._set_src(read_file(self.file.path))
         except IOError:
             panic(f"I/O Error: could not load the file '{self.file.path}'")
 
+    def get_bytes(self) -> bytes:
+        return self.src or b""
+
+    def get_text(self) -> str:
+        return self.get_bytes().decode("utf8")
+
+    def get_lines(self) -> list[str]:
+        return [line.decode("utf8") for line in self.get_bytes().splitlines(keepends=True)]
+
     def get_str_at(self, point: tuple[int, int]) -> str | None:
-        if self.src_lines is None:
-            return None
-        row, column = point
-        if row >= len(self.src_lines) or column >= len(self.src_lines[row]):
-            return None
-        return self.src_lines[row][column:]
+        c = self.get_bytes_at(point)
+        return c.decode("utf8") if c != None else None
 
     def get_str_between(
         self, start_point: tuple[int, int], end_point: tuple[int, int]
     ) -> str | None:
-        if self.src_lines is None:
-            return None
         row, start_column = start_point
         _, end_column = end_point
-        if row >= len(self.src_lines) or start_column >= len(self.src_lines[row]):
+        line = self._get_line_span(row)
+        if line is None or start_column >= line[1] - line[0]:
             return None
-        return self.src_lines[row][start_column:end_column]
+        return self.get_str_span(line[0] + start_column, min(line[0] + max(end_column, start_column), line[1]))
+
+    def get_str_span(self, start_byte: int, end_byte: int) -> str:
+        """Returns the text between two byte offsets, such as the start_byte and end_byte of a tree-sitter node.
+        """
+        return self.get_bytes()[start_byte:end_byte].decode("utf8")
 
     def get_bytes_at(self, point: tuple[int, int]) -> bytes | None:
-        c = self.get_str_at(point)
-        return c.encode("utf8") if c != None else None
+        row, column = point
+        line = self._get_line_span(row)
+        if line is None or column >= line[1] - line[0]:
+            return None
+        return self.get_bytes()[line[0] + column : line[1]]
 
     def get_block_between(
         self,
         start_point: tuple[int, int],
         end_point: tuple[int, int],
         show_line_numbers=False
+    ) -> str:
+        """Returns the lines between two points, each one without its first start column bytes.
+
+        The column is a byte column, so a line with multibyte characters before it keeps the character the column
+        falls in.
+        """
+        start_y, start_x = start_point
+        end_y, end_x = end_point
+        src = self.get_bytes()
+
+        if start_y == end_y or show_line_numbers:
+            return self._get_block_by_line(start_point, end_point, show_line_numbers)
+
+        first_line = self._get_line_span(start_y)
+        if first_line is None:
+            return ""
+        last_line = self._get_line_span(end_y)
+        block_end = last_line[0] if last_line is not None else len(src)
+        block = src[first_line[0] : block_end]
+        if start_x > 0:
+            block = _get_dedent_pattern(start_x).sub(b"", block)
+        if last_line is not None:
+            block += _get_line_between(src[last_line[0] : last_line[1]], start_x, end_x)
+        return block.decode("utf8")
+
+    def _get_block_by_line(
+        self,
+        start_point: tuple[int, int],
+        end_point: tuple[int, int],
+        show_line_numbers: bool,
     ) -> str:
         start_y, start_x = start_point
         end_y, end_x = end_point
 
         if start_y == end_y:
-            line = self.get_str_at((start_y, 0)) or ""
-            return line[start_x:end_x]
-
-        with StringIO() as buffer:
-            for y in range(start_y, end_y + 1):
-                line = self.get_str_at((y, 0)) or ""
-                if show_line_numbers:
-                    buffer.write(str(y).rjust(3, "0"))
-                    buffer.write(" ")
-                if y == end_y:
-                    buffer.write(line[start_x:end_x])
-                else:
-                    buffer.write(line[start_x:])
-            return buffer.getvalue()
+            line = self.get_bytes_at((start_y, 0)) or b""
+            return _get_line_between(line, start_x, end_x).decode("utf8")
+
+        block = []
+        for y in range(start_y, end_y + 1):
+            line = self.get_bytes_at((y, 0)) or b""
+            if show_line_numbers:
+                block.append(str(y).rjust(3, "0") + " ")
+            if y == end_y:
+                block.append(_get_line_between(line, start_x, end_x).decode("utf8"))
+            else:
+                block.append(line[_get_char_start(line, start_x) :].decode("utf8"))
+        return "".join(block)
+
+    def _get_line_span(self, row: int) -> tuple[int, int] | None:
+        if row < 0 or row >= len(self.line_starts):
+            return None
+        end = self.line_starts[row + 1] if row + 1 < len(self.line_starts) else len(self.get_bytes())
+        return (self.line_starts[row], end)
+
+    def _set_src(self, src: bytes) -> None:
+        # Same lines as a file read in text mode, whatever the line endings
+        if b"\r" in src:
+            src = src.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+        self.src = src
+        self.line_starts = [0] + [m.end() for m in re.finditer(b"\n", src) if m.end() < len(src)] if src else []
+
+
+def _get_char_start(line: bytes, column: int) -> int:
+    # Moves a byte column back to the start of the UTF-8 character it falls in
+    while 0 < column < len(line) and line[column] & 0xC0 == 0x80:
+        column -= 1
+    return column
+
+
+def _get_line_between(line: bytes, start_column: int, end_column: int) -> bytes:
+    # An empty span stays empty, even when its start column falls in a character
+    if end_column <= start_column:
+        return b""
+    return line[_get_char_start(line, start_column) : end_column]
+
+
+@lru_cache
+def _get_dedent_pattern(column: int) -> re.Pattern[bytes]:
+    # Removes the first column bytes of each line, and the whole line, newline included, if it is not longer. The cut
+    # backtracks before a UTF-8 continuation byte, so that it never splits a character.
+    return re.compile(b"^(?:[^\\n]{0,%d}\\n|[^\\n]{0,%d}(?![\\x80-\\xbf]))" % (column - 1, column), re.MULTILINE)
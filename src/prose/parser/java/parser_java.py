@@ -1,18 +1,18 @@
-import re
-
 from collections.abc import Iterable
+from functools import lru_cache
 from typing import Tuple
 
-from tree_sitter import Language, Parser, TreeCursor
+from tree_sitter import Language, Node, Parser, Query
 
 from prose.parser.code import Code
+from prose.parser.java.response_java import parse_javadoc, parse_tests
 from prose.parser.parser_base import ParserBase
 from prose.domain.code.file import File
 from prose.domain.code.clazz import Class
 from prose.domain.code.method import Method
 from prose.util.util import get_digest_string
 
-JAVA_LANGUAGE = Language("/usr/local/share/prose/build/grammar.so", "java")
+JAVA_GRAMMAR_PATH = "/usr/local/share/prose/build/grammar.so"
 JAVA_DOC_FRAMEWORK = "JAVADOC"
 JAVA_TEST_FRAMEWORK = "JUNIT"
 
@@ -41,23 +41,32 @@ Be sure to:
 * Do not include the import and class definition.
 """
 
-JAVA_IDENTIFIER = ["identifier", "scoped_identifier"]
 JAVA_BLOCK_COMMENT = ["block_comment"]
-JAVA_PACKAGE_DECLARATION = ["package_declaration"]
-JAVA_CLASS_DECLARATION = ["class_declaration", "interface_declaration"]
 JAVA_CLASS_BODY = ["class_body", "interface_body"]
-JAVA_METHOD_DECLARATION = ["constructor_declaration", "method_declaration"]
 JAVA_METHOD_BODY = ["constructor_body", "block", ";"]
 
-JAVA_COMMENT_JAVADOC = r"^\s*\/\*\*\n(\s*\*.*\n)+\s*\*\/"
-JAVA_TEST_FUNC = r"((?:@.+\n)+)([^@][^(]+\([^)]*\)[\s|\w]*)\s*({\n[^@]*\n\s*})\n"
-JAVA_REMOVE_SPACE = r"\s+"
+# Captures the package, the top-level types and the members of all the type bodies, in document order
+JAVA_QUERY = """
+(program (package_declaration [(identifier) (scoped_identifier)] @package))
+(program [(class_declaration) (interface_declaration)] @class)
+(class_body [(constructor_declaration) (method_declaration)] @method)
+(interface_body (method_declaration) @method)
+"""
+
+
+@lru_cache
+def get_java_language() -> Tuple[Language, Query]:
+    """Loads the grammar and compiles the query once per process, when the first parser is built.
+    """
+    language = Language(JAVA_GRAMMAR_PATH, "java")
+    return language, language.query(JAVA_QUERY)
 
 
 class ParserJava(ParserBase):
     def __init__(self):
+        language, self.query = get_java_language()
         self.parser = Parser()
-        self.parser.set_language(JAVA_LANGUAGE)
+        self.parser.set_language(language)
 
     def get_prompt_class_comment(self, clazz: Class) -> str | None:
         return "\n".join(
@@ -66,40 +75,36 @@ class ParserJava(ParserBase):
         )
 
     def is_valid_class_comment(self, comment: str) -> bool:
-        return re.search(JAVA_COMMENT_JAVADOC, comment) is not None
+        return parse_javadoc(comment) is not None
 
     def cleanup_class_comment(self, comment: str) -> list[str] | None:
-        m = re.search(JAVA_COMMENT_JAVADOC, comment)
-        if m is not None:
-            return m.group(0).splitlines()
+        javadoc = parse_javadoc(comment)
+        if javadoc is not None:
+            return javadoc.splitlines()
 
     def get_prompt_method_comment(self, method: Method) -> str | None:
         return "\n".join([JAVA_PROMPT_DOCUMENT_METHOD] + method.code)
 
     def is_valid_method_comment(self, comment: str) -> bool:
-        return re.search(JAVA_COMMENT_JAVADOC, comment) is not None
+        return parse_javadoc(comment) is not None
 
     def cleanup_method_comment(self, comment: str) -> list[str] | None:
-        m = re.search(JAVA_COMMENT_JAVADOC, comment)
-        if m is not None:
-            return m.group(0).splitlines()
+        javadoc = parse_javadoc(comment)
+        if javadoc is not None:
+            return javadoc.splitlines()
 
     def get_prompt_method_tests(self, method: Method) -> str:
         return "\n".join([JAVA_PROMPT_UNIT_TEST] + method.code)
 
     def is_valid_method_tests(self, tests: str) -> bool:
-        return re.search(JAVA_TEST_FUNC, tests) is not None
+        return len(parse_tests(tests)) > 0
 
     def cleanup_method_tests(
         self, tests: str
     ) -> list[Tuple[list[str], list[str], list[str]]] | None:
         return [
-            (
-                decorator.strip().splitlines(),
-                declaration.strip().splitlines(),
-                body.strip().splitlines(),
-            )
-            for decorator, declaration, body in re.findall(JAVA_TEST_FUNC, tests)
+            (list(decorator), list(declaration), list(body))
+            for decorator, declaration, body in parse_tests(tests)
         ]
 
     def get_test_stub(self, code_file: File) -> list[str]:
@@ -121,29 +126,49 @@ class ParserJava(ParserBase):
         return file.endswith(".java")
 
     def parse(self, code: Code) -> None:
-        tree = self.parser.parse(lambda _, p: code.get_bytes_at(p))  # type: ignore
-        cursor = tree.walk()
-        cursor.goto_first_child()
-        self._parse_class_or_interface(code, cursor, code.file)
-        if code.file.clazz is not None:
-            while self._parse_method(code, cursor, code.file):
-                pass
-
-    def _parse_class_or_interface(self, code: Code, cursor: TreeCursor, file: File) -> None:
-        package_name_point = self._parse_class_package_name(cursor)
-        clazz_point, comment_point = self._accept_with_comment(cursor, JAVA_CLASS_DECLARATION)
-        child_cursor = cursor.copy()
-        child_cursor.goto_first_child()
-        signature_point, name_point = self._parse_class_signature(child_cursor)
+        tree = self.parser.parse(code.get_bytes())
+
+        package_node = None
+        clazz_node = None
+        method_nodes = []
+        for node, capture in self.query.captures(tree.root_node):
+            if capture == "package" and package_node is None:
+                package_node = node
+            elif capture == "class" and clazz_node is None:
+                clazz_node = node
+            elif capture == "method":
+                method_nodes.append(node)
+
+        if clazz_node is None:
+            return
+        body_node = self._parse_class(code, clazz_node, package_node, code.file)
+        if body_node is None or code.file.clazz is None:
+            return
+
+        methods = {method.signature: method for method in code.file.clazz.methods}
+        for method_node in method_nodes:
+            # Only the members of the class itself, not the ones of its nested classes
+            parent = method_node.parent
+            if parent is not None and parent.start_byte == body_node.start_byte:
+                self._parse_method(code, method_node, methods, code.file)
+
+    def _parse_class(self, code: Code, node: Node, package_node: Node | None, file: File) -> Node | None:
+        name_node = node.child_by_field_name("name")
+        body_node = self._find_child(node, JAVA_CLASS_BODY)
+        if name_node is None or body_node is None or body_node.prev_sibling is None:
+            return None
 
         # Collect class info
 
-        clazz_package = code.get_str_between(*package_name_point) or ""
-        clazz_name = code.get_str_between(*name_point) or ""
+        clazz_point = (node.start_point, node.end_point)
+        signature_point = (node.start_point, body_node.prev_sibling.end_point)
+        clazz_package = code.get_str_span(package_node.start_byte, package_node.end_byte) if package_node else ""
+        clazz_name = code.get_str_span(name_node.start_byte, name_node.end_byte)
         clazz_signature = code.get_block_between(*signature_point) or ""
         clazz_code = code.get_block_between(*clazz_point) or ""
         clazz_digest = get_digest_string(clazz_code)
         clazz_comment = None
+        comment_point = self._get_comment_point(node)
         if comment_point is not None:
             comment = code.get_block_between(*comment_point)
             if self.is_valid_class_comment(comment):
@@ -160,49 +185,26 @@ class ParserJava(ParserBase):
         file.clazz.has_llm_comment = False
         file.clazz.comment = clazz_comment
 
-        # Find the class body
-        cursor.goto_first_child()
-        while cursor.node.type not in JAVA_CLASS_BODY:
-            cursor.goto_next_sibling()
-        cursor.goto_first_child()
-
-    def _parse_class_package_name(
-        self, cursor: TreeCursor
-    ) -> Tuple[Tuple[int, int], Tuple[int, int]]:
-        self._accept(cursor, JAVA_PACKAGE_DECLARATION)
-        child_cursor = cursor.copy()
-        child_cursor.goto_first_child()
-        return self._accept(child_cursor, JAVA_IDENTIFIER)
-
-    def _parse_class_signature(self, cursor: TreeCursor) -> Tuple[
-        Tuple[Tuple[int, int], Tuple[int, int]],
-        Tuple[Tuple[int, int], Tuple[int, int]],
-    ]:
-        signature_start_point = cursor.node.start_point
-        name_point = self._accept(cursor, JAVA_IDENTIFIER)
-        self._accept(cursor, JAVA_CLASS_BODY)
-        assert cursor.node.prev_sibling is not None
-        signature_point = (signature_start_point, cursor.node.prev_sibling.end_point)
-        return (signature_point, name_point)
-
-    def _parse_method(self, code: Code, cursor: TreeCursor, file: File) -> bool:
+        return body_node
+
+    def _parse_method(self, code: Code, node: Node, methods: dict[str, Method], file: File) -> None:
         assert file.clazz is not None
 
-        try:
-            method_point, comment_point = self._accept_with_comment(cursor, JAVA_METHOD_DECLARATION)
-            child_cursor = cursor.copy()
-            child_cursor.goto_first_child()
-            signature_point, name_point = self._parse_method_signature(child_cursor)
-        except:
-            return False
+        name_node = node.child_by_field_name("name")
+        body_node = self._find_child(node, JAVA_METHOD_BODY)
+        if name_node is None or body_node is None or body_node.prev_sibling is None:
+            return
 
         # Collect method info
 
-        method_name = code.get_str_between(*name_point) or ""
+        method_point = (node.start_point, node.end_point)
+        signature_point = (node.start_point, body_node.prev_sibling.end_point)
+        method_name = code.get_str_span(name_node.start_byte, name_node.end_byte)
         method_signature = code.get_block_between(*signature_point) or ""
         method_code = code.get_block_between(*method_point) or ""
         method_digest = get_digest_string(method_code)
         method_comment = None
+        comment_point = self._get_comment_point(node)
         if comment_point is not None:
             comment = code.get_block_between(*comment_point)
             if self.is_valid_method_comment(comment):
@@ -210,11 +212,10 @@ class ParserJava(ParserBase):
 
         # Add method to file
 
-        method = next(
-            filter(lambda x: x.signature == method_signature, file.clazz.methods), None
-        )
+        method = methods.get(method_signature)
         if method is None:
             method = Method(method_name, method_signature)
+            methods[method_signature] = method
             file.clazz.methods.append(method)
         method.digest = method_digest
         method.start_point = method_point[0]
@@ -223,42 +224,11 @@ class ParserJava(ParserBase):
         method.has_llm_comment = False
         method.comment = method_comment
 
-        # Go to the next method
-        cursor.goto_next_sibling()
-
-        return True
-
-    def _parse_method_signature(self, cursor: TreeCursor) -> Tuple[
-        Tuple[Tuple[int, int], Tuple[int, int]],
-        Tuple[Tuple[int, int], Tuple[int, int]],
-    ]:
-        signature_start_point = cursor.node.start_point
-        name_point = self._accept(cursor, JAVA_IDENTIFIER)
-        self._accept(cursor, JAVA_METHOD_BODY)
-        assert cursor.node.prev_sibling is not None
-        signature_point =  (signature_start_point, cursor.node.prev_sibling.end_point)
-        return (signature_point, name_point)
-
-    def _accept(self, cursor: TreeCursor, tokens: list[str]) -> Tuple[Tuple[int, int], Tuple[int, int]]:
-        has_sibling = True
-        while has_sibling and cursor.node.type not in tokens:
-            has_sibling = cursor.goto_next_sibling()
-        if not has_sibling:
-            raise Exception(f"Tokens not found: {tokens}")
-        return (cursor.node.start_point, cursor.node.end_point)
-
-    def _accept_with_comment(self, cursor: TreeCursor, tokens: list[str]) -> Tuple[
-        Tuple[Tuple[int, int], Tuple[int, int]],
-        Tuple[Tuple[int, int], Tuple[int, int]] | None,
-    ]:
-        comment_point = None
-        has_sibling = True
-        while has_sibling and cursor.node.type not in tokens:
-            if cursor.node.type in JAVA_BLOCK_COMMENT:
-                comment_point = (cursor.node.start_point, cursor.node.end_point)
-            else:
-                comment_point = None
-            has_sibling = cursor.goto_next_sibling()
-        if not has_sibling:
-            raise Exception(f"Tokens not found: {tokens}")
-        return ((cursor.node.start_point, cursor.node.end_point), comment_point)
+    def _find_child(self, node: Node, types: list[str]) -> Node | None:
+        return next((child for child in node.children if child.type in types), None)
+
+    def _get_comment_point(self, node: Node) -> Tuple[Tuple[int, int], Tuple[int, int]] | None:
+        comment_node = node.prev_sibling
+        if comment_node is None or comment_node.type not in JAVA_BLOCK_COMMENT:
+            return None
+        return (comment_node.start_point, comment_node.end_point)
@@ -0,0 +1,127 @@
+from functools import lru_cache
+from typing import Tuple
+
+# The responses are validated then cleaned up, often from several threads, so the last parses are kept
+RESPONSE_CACHE_SIZE = 64
+
+JavaTest = Tuple[Tuple[str, ...], Tuple[str, ...], Tuple[str, ...]]
+
+
+@lru_cache(maxsize=RESPONSE_CACHE_SIZE)
+def parse_javadoc(response: str) -> str | None:
+    """Returns the JAVADOC comment the response starts with, or None if there is none.
+
+    The comment opens with a "/**" line followed by at least one line starting with "*", and closes at the last
+    line starting with "*/" before a line that does not start with "*". Each line is read once.
+
+    Args:
+        response (str): The response of the LLM.
+
+    Returns:
+        The comment, from the start of the response to the end of its closing "*/".
+    """
+    position = len(response) - len(response.lstrip())
+    if not response.startswith("/**\n", position):
+        return None
+    position += 4
+
+    end = None
+    has_line = False
+    while position < len(response):
+        line_end = response.find("\n", position)
+        if line_end < 0:
+            line_end = len(response)
+        line = response[position:line_end]
+        stripped = line.lstrip()
+        if stripped != "":
+            if not stripped.startswith("*"):
+                break
+            if has_line and stripped.startswith("*/"):
+                end = position + len(line) - len(stripped) + 2
+            has_line = line_end < len(response)
+        position = line_end + 1
+
+    return response[:end] if end is not None else None
+
+
+@lru_cache(maxsize=RESPONSE_CACHE_SIZE)
+def parse_tests(response: str) -> tuple[JavaTest, ...]:
+    """Returns the annotated test methods of the response, as (annotations, declaration, body) lines.
+
+    A test is a run of annotation lines, a declaration with its parameters, and a body opening with "{" at the end of
+    a line and closing with the last "}" line before the next annotation. Each line is read once, and a failed
+    candidate resumes from the line where it failed.
+
+    Args:
+        response (str): The response of the LLM.
+
+    Returns:
+        The tests, with the blank lines around each part removed.
+    """
+    lines = response.split("\n")
+    tests = []
+
+    i = 0
+    while i < len(lines):
+        if "@" not in lines[i]:
+            i += 1
+            continue
+
+        # Annotations
+        start = i
+        while i < len(lines) - 1 and lines[i].lstrip().startswith("@"):
+            i += 1
+        if i == start:
+            i += 1
+            continue
+        annotations = "\n".join(lines[start:i])
+        annotations = annotations[annotations.index("@"):]
+
+        # Declaration, up to the opening brace
+        start = i
+        while (
+            i < len(lines) - 1
+            and not lines[i].lstrip().startswith("@")
+            and not lines[i].rstrip().endswith("{")
+        ):
+            i += 1
+        if i == len(lines) - 1 or lines[i].lstrip().startswith("@"):
+            continue
+        declaration = "\n".join(lines[start : i + 1]).rstrip()[:-1]
+        if not _is_declaration(declaration):
+            i += 1
+            continue
+
+        # Body, up to the last closing brace line before the next annotation
+        start = i
+        end = None
+        i += 1
+        while i < len(lines) - 1 and "@" not in lines[i]:
+            if lines[i].strip() == "}" and i > start + 1:
+                end = i
+            i += 1
+        if end is None:
+            continue
+        body = "{\n" + "\n".join(lines[start + 1 : end + 1])
+
+        tests.append(
+            (
+                tuple(annotations.strip().splitlines()),
+                tuple(declaration.strip().splitlines()),
+                tuple(body.strip().splitlines()),
+            )
+        )
+        i = end + 1
+
+    return tuple(tests)
+
+
+def _is_declaration(declaration: str) -> bool:
+    # A name, then the parameters, then only words such as a throws clause
+    name, _, rest = declaration.partition("(")
+    _, parenthesis, clauses = rest.partition(")")
+    return (
+        name.strip() != ""
+        and parenthesis != ""
+        and all(c.isspace() or c.isalnum() or c in "_|" for c in clauses)
+    )
@@ -0,0 +1,70 @@
+import os
+
+from prose.dao.blob.object_repository import ObjectRepository
+from prose.dao.blob.stage_repository import StageRepository
+from prose.domain.blob.config import Config
+from prose.domain.blob.stage import Stage
+from prose.util.util import panic
+
+
+class StageOp:
+
+    def __init__(self, config: Config):
+        self._config = config
+        self._stage_repo = StageRepository()
+        self._object_repo = ObjectRepository()
+
+    def combine(self, *prose_dirs: str):
+        """Combine the partial stages written by 'add --shard i/n' into the stage of a single add.
+
+        The objects of each shard are copied, then the trees of the shards are combined into a root tree with the same
+        digest as a single add of the whole source tree. All the shards of the same source tree are required.
+
+        Args:
+            prose_dirs (str): The .prose directories of the shards.
+        """
+        from prose.tree.tree_combiner import TreeCombiner
+
+        if len(prose_dirs) == 0:
+            return panic("No shards to combine")
+
+        stages = []
+        for prose_dir in prose_dirs:
+            stage = StageRepository(prose_dir).load()
+            if stage is None:
+                return panic(f"No files staged in '{prose_dir}'")
+            if stage.shard is None:
+                return panic(f"The stage of '{prose_dir}' is not a shard")
+            stages.append(stage)
+
+        shards = sorted(parse_shard(stage.shard) for stage in stages if stage.shard is not None)
+        count = shards[0][1] if len(shards) > 0 else 0
+        if shards != [(index, count) for index in range(1, count + 1)]:
+            got = ", ".join(f"{i}/{n}" for i, n in shards)
+            return panic(f"Expected the shards 1/{count} to {count}/{count}, got {got}")
+        if len({os.path.normpath(stage.path) for stage in stages}) > 1:
+            return panic("The shards add different source trees")
+
+        count = 0
+        for prose_dir in prose_dirs:
+            count += self._object_repo.copy(ObjectRepository(prose_dir))
+
+        tree = TreeCombiner(self._config).combine([stage.tree for stage in stages])
+        self._stage_repo.save(Stage(tree, stages[0].path))
+        print(f"stage {tree}, {len(stages)} shards combined, {count} objects copied")
+
+
+def parse_shard(shard: str) -> tuple[int, int]:
+    """Returns the index and the number of shards of an "i/n" shard, the index from 1 to n.
+
+    Args:
+        shard (str): The shard, such as "2/8".
+    """
+    index, _, count = str(shard).partition("/")
+    try:
+        result = int(index), int(count)
+    except ValueError:
+        result = 0, 0
+    if not 1 <= result[0] <= result[1]:
+        panic(f"Invalid shard '{shard}', expected i/n with i from 1 to n")
+    return result
@@ -0,0 +1,178 @@
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, TypeAlias
+
+from prose.dao.blob.stat_cache_repository import StatCacheRepository
+from prose.dao.code.file_repository import FileRepository
+from prose.domain.blob.commit import Commit
+from prose.domain.blob.config import Config
+from prose.domain.code.file import File
+from prose.llm.llm_base import LLMBase
+from prose.parser.parser_base import ParserBase
+from prose.tree.tree_walker import TreeWalker
+from prose.util.util import get_digest_bytes, read_file
+
+CHECK_CHUNK_SIZE = 16
+
+# The comments and the string and char literals of the tests, which do not call any method
+TEST_NON_CODE_PATTERN = re.compile(r'//[^\n]*|/\*.*?\*/|"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'', re.DOTALL)
+
+# A class or a method without comment or tests: its file, class, method (None for the class) and what is missing
+Offense: TypeAlias = dict[str, Any]
+
+# The committed digests of the comment and of the tests of a file, by source path
+Committed: TypeAlias = tuple[str | None, str | None]
+
+_checker_file_repo: FileRepository | None = None
+
+
+def _init_checker(parser_type: type[ParserBase]) -> None:
+    global _checker_file_repo
+    _checker_file_repo = FileRepository(parser_type(), LLMBase())
+
+
+def _check_file_in_checker(file_path: str, file_digest: str | None, committed: Committed) -> list[Offense]:
+    assert _checker_file_repo is not None
+    return _check_file(_checker_file_repo, file_path, file_digest, committed)
+
+
+def _check_file(
+    file_repo: FileRepository,
+    file_path: str,
+    file_digest: str | None,
+    committed: Committed,
+) -> list[Offense]:
+    """Returns the offenses of a file. Runs in the checker processes with --jobs.
+
+    A file whose source and tests are the ones merged by the last commit is not parsed.
+    """
+    comment_digest, test_digest = committed
+    src = None
+    if file_digest is None and comment_digest is not None:
+        src = read_file(file_path)
+        file_digest = get_digest_bytes(src)
+    if file_digest is not None and file_digest == comment_digest:
+        test_path = get_test_path(file_path, os.path.basename(file_path))
+        if test_digest is None or (
+            os.path.exists(test_path) and get_digest_bytes(read_file(test_path)) == test_digest
+        ):
+            return []
+
+    file = file_repo.parse(file_path, src)
+    return _get_offenses(file)
+
+
+def _get_offenses(file: File) -> list[Offense]:
+    if file.clazz is None:
+        return []
+
+    test_src = None
+    if not file.clazz.disable_tests:
+        test_path = get_test_path(file.path, file.name)
+        if os.path.exists(test_path):
+            test_src = TEST_NON_CODE_PATTERN.sub(" ", read_file(test_path).decode("utf8", errors="replace"))
+        else:
+            test_src = ""
+
+    offenses = []
+    if file.clazz.comment is None:
+        offenses.append(_get_offense(file, None, ["comment"]))
+    for method in file.clazz.methods:
+        # A method is tested if the code of the tests calls it by its whole name, as the generated tests do
+        missing = []
+        if method.comment is None:
+            missing.append("comment")
+        if test_src is not None and re.search(rf"(?<![\w$]){re.escape(method.name)}\s*\(", test_src) is None:
+            missing.append("tests")
+        if len(missing) > 0:
+            offenses.append(_get_offense(file, method.name, missing))
+    return offenses
+
+
+def _get_offense(file: File, method: str | None, missing: list[str]) -> Offense:
+    assert file.clazz is not None
+    return {
+        "path": os.path.normpath(file.path),
+        "class": file.clazz.name,
+        "method": method,
+        "missing": missing,
+    }
+
+
+def get_test_path(file_path: str, file_name: str) -> str:
+    return file_path.replace("/main/", "/test/", 1).replace(file_name, "Test" + file_name)
+
+
+class TreeChecker:
+    """Finds the classes and methods without comment or tests, without querying the LLM.
+
+    The files are hashed, using the stat cache left by add, and the ones unchanged since the last commit merged them
+    are skipped. The others are parsed, and their comments and tests are looked up in the sources.
+    """
+
+    def __init__(self, config: Config, parser: ParserBase):
+        self.config = config
+        self.file_repo = FileRepository(parser, LLMBase())
+        self.stat_cache_repo = StatCacheRepository()
+
+    def check(self, src_path: str, commit: Commit | None, jobs: int = 1) -> tuple[int, list[Offense]]:
+        """Checks the files of a source tree.
+
+        Args:
+            src_path (str): The source tree, relative to the base path.
+            commit (Commit | None): The last commit, if any.
+            jobs (int): Number of processes hashing and parsing the files in parallel.
+
+        Returns:
+            The number of files checked, and the offenses sorted by file.
+        """
+        full_path = os.path.join(self.config.base_path, src_path)
+        file_paths = sorted(
+            os.path.join(root, file)
+            for root, _, files in os.walk(full_path)
+            for file in files
+            if self.file_repo.get_parser().filter(file)
+        )
+
+        stat_cache = self.stat_cache_repo.load()
+        file_digests = []
+        for file_path in file_paths:
+            entry = stat_cache.get(file_path)
+            file_digests.append(entry.digest if entry is not None and entry.matches(os.stat(file_path)) else None)
+
+        committed = self._load_committed(commit)
+        file_committed = [committed.get(os.path.normpath(file_path), (None, None)) for file_path in file_paths]
+
+        if jobs > 1:
+            with ProcessPoolExecutor(
+                jobs,
+                initializer=_init_checker,
+                initargs=(type(self.file_repo.get_parser()),),
+            ) as executor:
+                offenses = list(
+                    executor.map(
+                        _check_file_in_checker, file_paths, file_digests, file_committed, chunksize=CHECK_CHUNK_SIZE
+                    )
+                )
+        else:
+            offenses = list(map(partial(_check_file, self.file_repo), file_paths, file_digests, file_committed))
+
+        return len(file_paths), [offense for file_offenses in offenses for offense in file_offenses]
+
+    def _load_committed(self, commit: Commit | None) -> dict[str, Committed]:
+        committed: dict[str, Committed] = {}
+        if commit is None:
+            return committed
+
+        for comment_or_test, path in TreeWalker(self.config).iter(commit.tree):
+            file_path = os.path.normpath(
+                os.path.join(self.config.base_path, commit.path, path, comment_or_test.name)
+            )
+            if comment_or_test.type == "comment":
+                committed[file_path] = (comment_or_test.digest, committed.get(file_path, (None, None))[1])
+            elif comment_or_test.type == "test":
+                file_path = os.path.join(os.path.dirname(file_path), comment_or_test.name.removeprefix("Test"))
+                committed[file_path] = (committed.get(file_path, (None, None))[0], comment_or_test.digest)
+        return committed
@@ -0,0 +1,41 @@
+from prose.dao.blob.tree_repository import TreeRepository
+from prose.domain.blob.config import Config
+from prose.domain.blob.tree import Tree
+from prose.util.util import panic
+
+
+class TreeCombiner:
+    """Combines the trees written by the shards of an add into the trees of a single run.
+
+    The shards write all the folders of the source tree, and each of its files in exactly one shard. The folders are
+    combined by name, and the files are merged, in the order TreeWriter writes them: the folders first, then the files,
+    both sorted by name.
+    """
+
+    def __init__(self, config: Config):
+        self.config = config
+        self.tree_repo = TreeRepository()
+
+    def combine(self, root_digests: list[str]) -> str:
+        """Combines the root trees of the shards, and returns the digest of the combined root tree.
+        """
+        trees = [self.tree_repo.load(digest) or [] for digest in root_digests]
+        return self._combine_rec(trees)
+
+    def _combine_rec(self, trees: list[list[Tree]]) -> str:
+        folders: dict[str, list[str]] = {}
+        files: dict[str, Tree] = {}
+        for tree in trees:
+            for node in tree:
+                if node.type == "tree":
+                    folders.setdefault(node.name, []).append(node.digest)
+                elif node.name not in files:
+                    files[node.name] = node
+                elif files[node.name] != node:
+                    panic(f"File '{node.name}' added by several shards")
+
+        blob_content = [
+            Tree("tree", self._combine_rec([self.tree_repo.load(digest) or [] for digest in folders[name]]), name)
+            for name in sorted(folders)
+        ] + [files[name] for name in sorted(files)]
+        return self.tree_repo.save(blob_content)
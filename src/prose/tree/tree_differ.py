@@ -0,0 +1,65 @@
+import os
+from typing import Callable, Iterator, TypeAlias
+
+from prose.dao.blob.tree_repository import TreeRepository
+from prose.domain.blob.config import Config
+from prose.domain.blob.tree import Tree
+
+TreeDifferFunc: TypeAlias = Callable[[str, Tree | None, Tree | None, str], None]
+TreeChange: TypeAlias = tuple[str, Tree | None, Tree | None, str]
+
+TREE_ADDED = "added"
+TREE_DELETED = "deleted"
+TREE_MODIFIED = "modified"
+
+
+class TreeDiffer:
+    """Compares two trees, descending only into the entries whose digests differ.
+
+    The function is called for each comment or test added, deleted or modified, with its old and new nodes and the
+    path of its file.
+    """
+
+    def __init__(self, config: Config):
+        self.config = config
+        self.tree_repo = TreeRepository()
+
+    def diff(self, old_digest: str | None, new_digest: str | None, func: TreeDifferFunc) -> None:
+        for status, old_node, new_node, path in self.iter(old_digest, new_digest):
+            func(status, old_node, new_node, path)
+
+    def iter(self, old_digest: str | None, new_digest: str | None) -> Iterator[TreeChange]:
+        """Yields the changes as the trees are compared, loading the subtrees lazily.
+        """
+        if old_digest == new_digest:
+            return
+        yield from self._iter_rec(self._load(old_digest), self._load(new_digest), "")
+
+    def _iter_rec(self, old_tree: list[Tree], new_tree: list[Tree], path: str) -> Iterator[TreeChange]:
+        old_nodes = {(node.type, node.name): node for node in old_tree}
+        new_nodes = {(node.type, node.name): node for node in new_tree}
+
+        for key in list(new_nodes) + [key for key in old_nodes if key not in new_nodes]:
+            old_node = old_nodes.get(key)
+            new_node = new_nodes.get(key)
+            if old_node is not None and new_node is not None and old_node.digest == new_node.digest:
+                continue
+
+            node_type, node_name = key
+            if node_type in ["tree", "file"]:
+                yield from self._iter_rec(
+                    self._load(old_node.digest if old_node is not None else None),
+                    self._load(new_node.digest if new_node is not None else None),
+                    os.path.join(path, node_name) if node_type == "tree" else path,
+                )
+            elif old_node is None:
+                yield TREE_ADDED, None, new_node, path
+            elif new_node is None:
+                yield TREE_DELETED, old_node, None, path
+            else:
+                yield TREE_MODIFIED, old_node, new_node, path
+
+    def _load(self, digest: str | None) -> list[Tree]:
+        if digest is None:
+            return []
+        return self.tree_repo.load(digest) or []
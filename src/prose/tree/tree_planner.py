@@ -0,0 +1,98 @@
+import os
+
+from prose.dao.blob.object_repository import ObjectRepository
+from prose.dao.blob.queue_repository import QueueRepository
+from prose.dao.blob.tree_repository import TreeRepository
+from prose.dao.code.file_repository import FileRepository
+from prose.domain.blob.config import Config
+from prose.domain.blob.job import Job
+from prose.domain.code.file import File
+from prose.llm.llm_base import LLMBase
+from prose.llm.llm_chat import LLM_CLASS_COMMENT, LLM_METHOD_COMMENT, LLM_METHOD_TESTS, LLMChat
+from prose.parser.parser_base import ParserBase
+from prose.tree.tree_writer import Shard, get_shard
+from prose.util.util import get_digest_bytes, read_file, removeNonesIfAny
+
+
+class TreePlanner:
+    """Queues the LLM requests that an add of a source tree would send, for the workers to complete them.
+
+    The files are selected, parsed and prompted as TreeWriter does, but nothing is written but the jobs. The responses
+    of the workers go to the LLM cache, so the add run once all the jobs are done assembles the trees without querying
+    the LLM.
+    """
+
+    def __init__(self, config: Config, parser: ParserBase, llm: LLMChat):
+        self.config = config
+        self.parser = parser
+        self.llm = llm
+        self.file_repo = FileRepository(parser, LLMBase())
+        self.object_repo = ObjectRepository()
+        self.tree_repo = TreeRepository()
+        self.queue_repo = QueueRepository()
+
+    def plan(self, src_path: str, shard: Shard | None = None) -> tuple[int, int]:
+        """Queues the requests whose response is not cached yet.
+
+        Args:
+            src_path (str): The source tree, relative to the base path.
+            shard (Shard | None): The shard of the files to plan and the number of shards.
+
+        Returns:
+            The number of requests missing a response, and the number of them added to the queue.
+        """
+        full_path = os.path.join(self.config.base_path, src_path)
+        file_paths = sorted(
+            os.path.join(root, file)
+            for root, _, files in os.walk(full_path)
+            for file in files
+            if self.parser.filter(file)
+        )
+        if shard is not None:
+            index, count = shard
+            file_paths = [
+                file_path
+                for file_path in file_paths
+                if get_shard(os.path.relpath(file_path, full_path), count) == index
+            ]
+
+        jobs: dict[str, Job] = {}
+        for file_path in file_paths:
+            src = read_file(file_path)
+            if self.object_repo.exists(get_digest_bytes(src)):
+                continue
+            for job in self._plan_file(self.file_repo.parse(file_path, src)):
+                jobs.setdefault(job.digest, job)
+
+        missing = [job for job in jobs.values() if not self.llm.is_cached(job.prompt, job.kind)]
+        return len(missing), self.queue_repo.enqueue(missing)
+
+    def _plan_file(self, file: File) -> list[Job]:
+        # The same requests as FileRepository.load, the class comment being built from the comments in the code
+        clazz = file.clazz
+        if clazz is None:
+            return []
+
+        jobs: list[Job | None] = []
+        if clazz.comment is None:
+            jobs.append(
+                self._get_job(self.parser.get_prompt_class_comment(clazz), LLM_CLASS_COMMENT, file, clazz.name)
+            )
+
+        for method in clazz.methods:
+            if method.digest is None or self.tree_repo.exists(method.digest):
+                continue
+            target = f"{clazz.name}.{method.name}"
+            if method.comment is None:
+                prompt = self.parser.get_prompt_method_comment(method)
+                jobs.append(self._get_job(prompt, LLM_METHOD_COMMENT, file, target))
+            if method.tests is None:
+                prompt = self.parser.get_prompt_method_tests(method)
+                jobs.append(self._get_job(prompt, LLM_METHOD_TESTS, file, target))
+
+        return removeNonesIfAny(jobs)
+
+    def _get_job(self, prompt: str | None, kind: str, file: File, target: str) -> Job | None:
+        if prompt is None:
+            return None
+        return Job(self.llm.get_cache_digest(prompt), kind, prompt, f"{os.path.normpath(file.path)}:{target}")
@@ -1,5 +1,5 @@
 import os
-from typing import Callable, TypeAlias
+from typing import Callable, Iterator, TypeAlias
 
 from prose.dao.blob.blob_repository import BlobRepository
 from prose.dao.blob.commit_repository import CommitRepository
@@ -22,18 +22,23 @@ class TreeWalker:
         self.blob_repo = BlobRepository()
 
     def walk(self, root_digest: str, func: TreeWalkerFunc) -> None:
+        for comment_or_test, path in self.iter(root_digest):
+            func(comment_or_test, path)
+
+    def iter(self, root_digest: str) -> Iterator[tuple[Tree, str]]:
+        """Yields the comments and tests of a tree with the path of their file, loading the subtrees lazily.
+        """
         root = self.tree_repo.load(root_digest) or []
-        self._walk_rec(root, "", func)
+        yield from self._iter_rec(root, "")
 
-    def _walk_rec(self, tree: list[Tree], path: str, func: TreeWalkerFunc) -> None:
+    def _iter_rec(self, tree: list[Tree], path: str) -> Iterator[tuple[Tree, str]]:
         for node in tree:
             if node.type == "tree":
-                self._walk_rec(
+                yield from self._iter_rec(
                     self.tree_repo.load(node.digest) or [],
                     os.path.join(path, node.name),
-                    func,
                 )
             elif node.type == "file":
                 comment_or_tests = self.tree_repo.load(node.digest) or []
                 for comment_or_test in comment_or_tests:
-                    func(comment_or_test, path)
+                    yield comment_or_test, path
@@ -1,16 +1,110 @@
 import os
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import partial
+from typing import TypeAlias
 
 from prose.dao.code.file_repository import FileRepository
 from prose.dao.blob.ref_repository import RefRepository
 from prose.dao.blob.tree_repository import TreeRepository
 from prose.dao.blob.blob_repository import BlobRepository
+from prose.dao.blob.journal_repository import JournalRepository
+from prose.dao.blob.object_repository import ObjectRepository
+from prose.dao.blob.stat_cache_repository import StatCacheRepository
 from prose.domain.blob.config import Config
 from prose.domain.code.file import File
+from prose.domain.blob.stat_entry import StatEntry
 from prose.domain.blob.tree import Tree
 from prose.llm.llm_base import LLMBase
 from prose.merger.merger import Merger
+from prose.merger.signature_index import SignatureIndex
 from prose.parser.parser_base import ParserBase
-from prose.util.util import get_digest_file, removeNonesIfAny
+from prose.parser.code import Code
+from prose.util.profiler import PROFILER
+from prose.util.util import get_digest_bytes, get_digest_string, read_file, removeNonesIfAny
+
+SCAN_CHUNK_SIZE = 16
+
+# Chunks scanned ahead by each scanner process, so the scans waiting to be written stay bounded in memory
+SCAN_CHUNKS_PER_JOB = 2
+
+# Kind of the journal entries of the files written, by file digest
+JOURNAL_FILE = "file"
+
+# The digest, the parsed file unless already known, and the source read to compute them
+Scan: TypeAlias = tuple[str, File | None, bytes | None]
+
+# The shard of the files to add and the number of shards, from 1 to n
+Shard: TypeAlias = tuple[int, int]
+
+_scanner_file_repo: FileRepository | None = None
+_scanner_object_repo: ObjectRepository | None = None
+
+
+def _init_scanner(parser_type: type[ParserBase]) -> None:
+    global _scanner_file_repo, _scanner_object_repo
+    _scanner_file_repo = FileRepository(parser_type(), LLMBase())
+    _scanner_object_repo = ObjectRepository()
+
+
+def _scan_file_in_scanner(file_path: str, file_digest: str | None) -> Scan:
+    assert _scanner_file_repo is not None and _scanner_object_repo is not None
+    return _scan_file(_scanner_file_repo, _scanner_object_repo, file_path, file_digest)
+
+
+def _scan_chunk_in_scanner(file_paths: list[str], file_digests: list[str | None]) -> list[Scan]:
+    return [_scan_file_in_scanner(file_path, file_digest) for file_path, file_digest in zip(file_paths, file_digests)]
+
+
+def _scan_chunks(
+    executor: ProcessPoolExecutor, file_paths: list[str], file_digests: list[str | None], window: int
+) -> Iterator[Scan]:
+    """Scans the files by chunks in the scanner processes, in order, with at most a window of chunks in flight.
+
+    Unlike Executor.map, which submits all the files at once, the scans are not read far ahead of the trees written.
+    """
+
+    def submit(start: int) -> Future[list[Scan]]:
+        end = start + SCAN_CHUNK_SIZE
+        return executor.submit(_scan_chunk_in_scanner, file_paths[start:end], file_digests[start:end])
+
+    starts = iter(range(0, len(file_paths), SCAN_CHUNK_SIZE))
+    futures = deque(submit(start) for _, start in zip(range(window), starts))
+    while futures:
+        scans = futures.popleft().result()
+        start = next(starts, None)
+        if start is not None:
+            futures.append(submit(start))
+        yield from scans
+
+
+def _scan_file(
+    file_repo: FileRepository,
+    object_repo: ObjectRepository,
+    file_path: str,
+    file_digest: str | None,
+) -> Scan:
+    """Hashes a file, then parses it unless it is already known. Runs in the scanner processes with --jobs.
+
+    The file is read once, and the same buffer is hashed, parsed and returned to be stored.
+    """
+    if file_digest is not None and object_repo.exists(file_digest):
+        return file_digest, None, None
+    with PROFILER.span(file_path, "read", stage=True):
+        src = read_file(file_path)
+    if file_digest is None:
+        with PROFILER.span(file_path, "hash", stage=True):
+            file_digest = get_digest_bytes(src)
+        if object_repo.exists(file_digest):
+            return file_digest, None, None
+    return file_digest, file_repo.parse(file_path, src), src
+
+
+def get_shard(file_path: str, count: int) -> int:
+    """Returns the shard of a file, from 1 to count, by the digest of its path relative to the source tree.
+    """
+    return int(get_digest_string(file_path)[:8], 16) % count + 1
 
 
 class TreeWriter:
@@ -20,17 +114,106 @@ class TreeWriter:
         self.ref_repo = RefRepository()
         self.tree_repo = TreeRepository()
         self.blob_repo = BlobRepository()
+        self.object_repo = ObjectRepository()
+        self.stat_cache_repo = StatCacheRepository()
+        self.stat_cache: dict[str, StatEntry] = {}
+        self.journal_repo = JournalRepository()
+        self.journal: dict[tuple[str, str], dict] = {}
 
-    def write(self, src_path: str) -> str | None:
+    def write(self, src_path: str, jobs: int = 1, shard: Shard | None = None) -> str | None:
+        """Writes the trees of a source tree, and returns the digest of its root.
+
+        With a shard, only the files of the shard are added, but all the folders are written so that the trees of the
+        shards can be combined into the trees of a single run.
+
+        Args:
+            src_path (str): The source tree, relative to the base path.
+            jobs (int): Number of processes hashing and parsing the files in parallel.
+            shard (Shard | None): The shard of the files to add and the number of shards.
+        """
         digest_objects = {}
         full_path = os.path.join(self.config.base_path, src_path)
-        for args in os.walk(full_path, topdown=False):
-            digest_objects = self._write_tree(digest_objects, *args)
-        return digest_objects.get(os.path.basename(src_path)) or digest_objects.get("")
+
+        walk = [
+            (root, sorted(folders), sorted(files))
+            for root, folders, files in os.walk(full_path, topdown=False)
+        ]
+        file_paths = [
+            os.path.join(root, file)
+            for root, _, files in walk
+            for file in files
+            if self.file_repo.get_parser().filter(file)
+        ]
+        if shard is not None:
+            index, count = shard
+            file_paths = [
+                file_path
+                for file_path in file_paths
+                if get_shard(os.path.relpath(file_path, full_path), count) == index
+            ]
+
+        self.stat_cache = self.stat_cache_repo.load()
+        self.journal = self.journal_repo.load()
+        scans = self._scan_files(file_paths, jobs)
+        scanned_paths = set(file_paths)
+        for args in walk:
+            digest_objects = self._write_tree(digest_objects, scans, scanned_paths, *args)
+        scans.close()
+
+        # The entries of the files gone from the source tree are dropped, but not the ones of a sibling such as src-gen
+        full_path_prefix = full_path.rstrip(os.sep) + os.sep
+        self.stat_cache_repo.save(
+            {
+                path: entry
+                for path, entry in self.stat_cache.items()
+                if path in scanned_paths or not path.startswith(full_path_prefix)
+            }
+        )
+
+        return digest_objects.get(full_path)
+
+    def _scan_files(self, file_paths: list[str], jobs: int) -> Iterator[Scan]:
+        stats = [os.stat(file_path) for file_path in file_paths]
+        cached_digests = [
+            self._get_cached_digest(file_path, stat)
+            for file_path, stat in zip(file_paths, stats)
+        ]
+
+        if jobs > 1:
+            with ProcessPoolExecutor(
+                jobs,
+                initializer=_init_scanner,
+                initargs=(type(self.file_repo.get_parser()),),
+            ) as executor:
+                scans = _scan_chunks(executor, file_paths, cached_digests, jobs * SCAN_CHUNKS_PER_JOB)
+                yield from self._update_stat_cache(file_paths, stats, scans)
+        else:
+            scans = map(
+                partial(_scan_file, self.file_repo, self.object_repo), file_paths, cached_digests
+            )
+            yield from self._update_stat_cache(file_paths, stats, scans)
+
+    def _update_stat_cache(
+        self,
+        file_paths: list[str],
+        stats: list[os.stat_result],
+        scans: Iterable[Scan],
+    ) -> Iterator[Scan]:
+        for file_path, stat, (file_digest, file, src) in zip(file_paths, stats, scans):
+            self.stat_cache[file_path] = StatEntry.of_stat(stat, file_digest)
+            yield file_digest, file, src
+
+    def _get_cached_digest(self, file_path: str, stat: os.stat_result) -> str | None:
+        entry = self.stat_cache.get(file_path)
+        if entry is not None and entry.matches(stat):
+            return entry.digest
+        return None
 
     def _write_tree(
         self,
         digest_objects: dict[str, str],
+        scans: Iterator[Scan],
+        scanned_paths: set[str],
         root: str,
         folders: list[str],
         files: list[str],
@@ -40,45 +223,64 @@ class TreeWriter:
 
         blob_content = removeNonesIfAny(
             [
-                Tree("tree", digest_objects[folder], folder)
+                Tree("tree", digest_objects[os.path.join(root, folder)], folder)
                 for folder in folders
-                if digest_objects.get(folder) is not None
+                if digest_objects.get(os.path.join(root, folder)) is not None
             ]
             + [
-                self._write_file(os.path.join(root, file))
+                self._write_file(os.path.join(root, file), *next(scans))
                 for file in files
-                if self.file_repo.get_parser().filter(file)
+                if os.path.join(root, file) in scanned_paths
             ]
         )
-        digest_objects[os.path.basename(root)] = self.tree_repo.save(blob_content)
+        digest_objects[root] = self.tree_repo.save(blob_content)
         return digest_objects
 
-    def _write_file(self, file_path: str) -> Tree | None:
-        file_digest = get_digest_file(file_path)
+    def _write_file(
+        self, file_path: str, file_digest: str, code_file: File | None, src: bytes | None
+    ) -> Tree | None:
         if self.tree_repo.exists(file_digest):
-            return None
+            # A file written by an interrupted add is still part of the stage of the add resuming it
+            file_tree = self.journal.get((file_digest, JOURNAL_FILE))
+            return Tree.of(file_tree) if file_tree is not None else None
+
+        with PROFILER.span(file_path, "file"):
+            return self._write_new_file(file_path, file_digest, code_file, src)
 
-        code_file = self.file_repo.load(file_path)
+    def _write_new_file(
+        self, file_path: str, file_digest: str, code_file: File | None, src: bytes | None
+    ) -> Tree | None:
+        if src is None:
+            src = read_file(file_path)
+        if code_file is None:
+            code_file = self.file_repo.parse(file_path, src)
+
+        code_file = self.file_repo.load(file_path, code_file)
         if code_file.clazz is None:
             return None
 
-        with open(file_path, "r") as f:
-            self.blob_repo.save(f.read(), file_digest)
+        code = Code(code_file, src)
 
-        blob_content = removeNonesIfAny(
-            [
-                self._write_comment(file_path, code_file, file_digest),
-                self._write_tests(file_path, code_file),
-            ]
-        )
+        with PROFILER.span(file_path, "merge", stage=True):
+            blob_content = removeNonesIfAny(
+                [
+                    self._write_comment(file_path, code.get_lines(), code_file, file_digest),
+                    self._write_tests(file_path, code_file),
+                ]
+            )
         blob_digest = self.tree_repo.save(blob_content)
+        file_tree = Tree("file", blob_digest, os.path.basename(file_path))
 
-        return Tree("file", blob_digest, os.path.basename(file_path))
+        # The source saved under the file digest marks the file as written, so it goes last, after the journal entry
+        # an interrupted add resumes the file from
+        self.journal_repo.append(file_digest, JOURNAL_FILE, file_tree.asdict())
+        self.blob_repo.save(code.get_text(), file_digest)
+        return file_tree
 
-    def _write_comment(self, file_path: str, file: File, file_digest: str) -> Tree:
+    def _write_comment(self, file_path: str, src_lines: list[str], file: File, file_digest: str) -> Tree:
         assert file.clazz is not None
 
-        comment_merger = Merger(file_path)
+        comment_merger = Merger(src_lines)
 
         if (
             file.clazz.start_point is not None
@@ -115,20 +317,15 @@ class TreeWriter:
         else:
             test_merger = Merger(test_path)
 
+        test_index = SignatureIndex(test_merger, self.file_repo.get_parser().get_end_of_code())
         for method in file.clazz.methods:
             if method.tests is not None and method.has_llm_tests:
                 first_test = True
                 for test in method.tests:
-                    if test_merger.find(test.signature) is None:
-                        end_of_code = test_merger.find_last(
-                            self.file_repo.get_parser().get_end_of_code()
-                        )
-                        if end_of_code is not None:
-                            if first_test:
-                                test_merger.merge((end_of_code[0], 4), test.code)
-                                first_test = False
-                            else:
-                                test_merger.merge((end_of_code[0], 4), [""] + test.code)
+                    if first_test:
+                        first_test = not test_index.insert(test.signature, test.code, 4)
+                    else:
+                        test_index.insert(test.signature, [""] + test.code, 4)
 
         blob_digest = self.blob_repo.save(test_merger.get_text())
         return Tree("test", blob_digest, os.path.basename(test_path))
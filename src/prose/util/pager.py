@@ -0,0 +1,59 @@
+import os
+import shlex
+import shutil
+import subprocess
+import sys
+from typing import Iterable
+
+PAGER_DEFAULT = "less -FRX"
+
+
+def page(lines: Iterable[str]) -> None:
+    """Streams lines to the pager as they are produced, or to stdout if it is not a terminal.
+
+    The pager is taken from $PAGER, like git and pydoc. Quitting the pager stops the production of the lines. As with
+    pydoc, the lines go to stdout on a dumb terminal or when the pager is not installed.
+
+    Args:
+        lines (Iterable[str]): The lines to show, without their line terminator.
+    """
+    pager = os.environ.get("PAGER", PAGER_DEFAULT).strip()
+    if (
+        not sys.stdout.isatty()
+        or os.environ.get("TERM") in ["dumb", "emacs"]
+        or pager in ["", "cat"]
+        or not _is_installed(pager)
+    ):
+        _write(lines)
+        return
+
+    process = subprocess.Popen(pager, shell=True, stdin=subprocess.PIPE, text=True, bufsize=1, errors="replace")
+    assert process.stdin is not None
+    try:
+        for line in lines:
+            process.stdin.write(line + "\n")
+        process.stdin.close()
+    except BrokenPipeError:
+        pass
+    except KeyboardInterrupt:
+        process.kill()
+    process.wait()
+
+
+def _is_installed(pager: str) -> bool:
+    try:
+        command = shlex.split(pager)
+    except ValueError:
+        return False
+    return len(command) > 0 and shutil.which(command[0]) is not None
+
+
+def _write(lines: Iterable[str]) -> None:
+    try:
+        for line in lines:
+            sys.stdout.write(line + "\n")
+        sys.stdout.flush()
+    except BrokenPipeError:
+        # The reader, such as head, is gone: silence the flush at exit
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
@@ -0,0 +1,106 @@
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from typing import Any, ContextManager, Iterator
+
+PROFILE_DEFAULT_PATH = os.path.join(".prose", "profile.json")
+
+
+class Profiler:
+    """Records spans and counters as a Chrome trace, readable in chrome://tracing or https://ui.perfetto.dev.
+
+    Disabled by default, a span then costs a single test. Stage spans also record the peak of the memory traced
+    during the span. The peak is reset at the start of each stage span, so stages overlapping in several threads
+    share it.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.events: list[dict[str, Any]] = []
+        self.counters: dict[str, int] = {}
+        self.stages: dict[str, dict[str, float]] = {}
+        self._start = 0.0
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        self.enabled = True
+        self._start = time.perf_counter()
+        tracemalloc.start()
+
+    def span(self, name: str, category: str, stage: bool = False, **args: Any) -> ContextManager[dict[str, Any]]:
+        """Times a block, with its arguments. The arguments can be completed inside the block, such as the tokens
+        used by a request.
+
+        Args:
+            name (str): The name of the span, such as the stage or the file.
+            category (str): The category of the span, such as "llm" or "parser".
+            stage (bool): Record the span in the per-stage summary, with its peak memory.
+        """
+        if not self.enabled:
+            return nullcontext(args)
+        return self._span(name, category, stage, args)
+
+    def count(self, name: str, value: int = 1) -> None:
+        if self.enabled:
+            with self._lock:
+                self.counters[name] = self.counters.get(name, 0) + value
+
+    def write(self, path: str = PROFILE_DEFAULT_PATH, **stats: Any) -> None:
+        """Writes the trace, with the counters, the per-stage summary and the given statistics.
+        """
+        if not self.enabled:
+            return
+
+        with self._lock:
+            trace = {
+                "traceEvents": self.events,
+                "displayTimeUnit": "ms",
+                "otherData": {
+                    "counters": self.counters,
+                    "stages": self.stages,
+                    "peak_memory": tracemalloc.get_traced_memory()[1],
+                    **stats,
+                },
+            }
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(trace, f)
+
+    @contextmanager
+    def _span(self, name: str, category: str, stage: bool, args: dict[str, Any]) -> Iterator[dict[str, Any]]:
+        if stage:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield args
+        finally:
+            end = time.perf_counter()
+            if stage:
+                args["peak_memory"] = tracemalloc.get_traced_memory()[1]
+            self._record(name, category, stage, start, end, args)
+
+    def _record(self, name: str, category: str, stage: bool, start: float, end: float, args: dict[str, Any]) -> None:
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": (start - self._start) * 1e6,
+            "dur": (end - start) * 1e6,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": args,
+        }
+        with self._lock:
+            self.events.append(event)
+            if stage:
+                summary = self.stages.setdefault(category, {"count": 0, "time": 0.0, "peak_memory": 0})
+                summary["count"] += 1
+                summary["time"] += end - start
+                summary["peak_memory"] = max(summary["peak_memory"], args["peak_memory"])
+
+
+PROFILER = Profiler()
@@ -2,33 +2,13 @@ import json
 import sys
 import hashlib
 
-from time import sleep
-from typing import Callable, TypeVar
+from typing import Any, TypeVar
 
 from termcolor import colored
 
 T = TypeVar("T")
 
-
-def retry(func: Callable[..., T], *args, count: int = 3) -> T | None:
-    """Retries calling a given function with arguments a specified number of times.
-
-    Args:
-        func (Callable[..., T]): The function to be called and retried.
-        *args: Variable-length argument list to pass to the function.
-        count (int): The number of times to retry the function call. Default is 3.
-
-    Returns:
-        None (if all retries fail) or the return value of the function call.
-    """
-    if count == 0:
-        return None
-
-    try:
-        return func(*args)
-    except:
-        sleep(1)
-        return retry(func, *args, count=count - 1)
+OBJECT_FORMAT_VERSION = 1
 
 
 def panic(msg: str) -> None:
@@ -88,6 +68,62 @@ def get_digest_object(o: dict | list[dict] | list[str]) -> str:
     return hashlib.sha256(json.dumps(o).encode("UTF-8")).hexdigest()
 
 
+def encode_object(o: Any) -> str:
+    """Returns the compact canonical encoding of a given object, as stored on disk.
+
+    Args:
+        o (Any): The object to encode.
+
+    Returns:
+        The minified JSON of the object wrapped with the format version
+    """
+    return json.dumps(
+        {"version": OBJECT_FORMAT_VERSION, "object": o},
+        separators=(",", ":"),
+        sort_keys=True,
+    )
+
+
+def decode_object(s: str) -> Any:
+    """Returns the object of a given encoding, either compact or legacy pretty-printed JSON.
+
+    Args:
+        s (str): The encoded object.
+
+    Returns:
+        The decoded object
+    """
+    o = json.loads(s)
+    if isinstance(o, dict) and o.keys() == {"version", "object"}:
+        return o["object"]
+    return o
+
+
+def get_digest_bytes(content: bytes) -> str:
+    """Returns the digest of a given content, as get_digest_file for the same bytes.
+
+    Args:
+        content (bytes): The content to digest.
+
+    Returns:
+        The digest of the content
+    """
+    return hashlib.sha256(content).hexdigest()
+
+
+def read_file(file_path: str) -> bytes:
+    """Returns the content of a given file, read in a single call.
+
+    Args:
+        file_path (str): The path of the file to read.
+
+    Returns:
+        The content of the file
+    """
+    with open(file_path, "rb") as f:
+        return f.read()
+
+
 def get_digest_file(file_path: str) -> str:
     """Returns the digest of a given file.
 
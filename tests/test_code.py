@@ -0,0 +1,62 @@
+from prose.domain.code.file import File
+from prose.parser.code import Code
+
+
+def get_code(src: bytes) -> Code:
+    return Code(File("A.java", "A.java"), src)
+
+
+def test_code_lines_crlf():
+    code = get_code(b"class A {\r\n    void f() {}\r\n}\r\n")
+    assert code.get_lines() == ["class A {\n", "    void f() {}\n", "}\n"]
+    assert code.get_text() == "class A {\n    void f() {}\n}\n"
+
+
+def test_code_lines_cr():
+    code = get_code(b"class A {\r    void f() {}\r}")
+    assert code.get_lines() == ["class A {\n", "    void f() {}\n", "}"]
+    assert code.get_str_between((1, 4), (1, 8)) == "void"
+
+
+def test_code_str_between():
+    code = get_code(b"int x;\nString s;\n")
+    assert code.get_str_between((1, 0), (1, 6)) == "String"
+    assert code.get_str_between((1, 7), (1, 99)) == "s;\n"
+    assert code.get_str_between((1, 99), (1, 100)) is None
+    assert code.get_str_between((2, 0), (2, 1)) is None
+
+
+def test_code_str_span():
+    src = "int x;\nString s = \"é\";\n".encode("utf8")
+    code = get_code(src)
+    start = src.index(b"\"")
+    assert code.get_str_span(start, start + 4) == "\"é\""
+
+
+def test_code_block_dedent():
+    code = get_code(b"    void f() {\n\n  // x\n        g();\n    }\n")
+    assert code.get_block_between((0, 4), (4, 5)) == "void f() {\n x\n    g();\n}"
+    assert code.get_block_between((0, 4), (4, 5), show_line_numbers=True) == (
+        "000 void f() {\n001 002  x\n003     g();\n004 }"
+    )
+
+
+def test_code_block_multibyte_in_dedent_column():
+    # The method is indented by 4 bytes, and the line in between has a 2-byte character over the column
+    src = "    void f() {\n   é x\n    }\n".encode("utf8")
+    code = get_code(src)
+    assert code.get_block_between((0, 4), (2, 5)) == "void f() {\né x\n}"
+    assert code.get_block_between((0, 4), (2, 5), show_line_numbers=True) == "000 void f() {\n001 é x\n002 }"
+
+
+def test_code_block_multibyte_at_last_line_column():
+    code = get_code("  a\n  €}\n".encode("utf8"))
+    assert code.get_block_between((0, 3), (1, 6)) == "\n€}"
+    assert code.get_block_between((1, 3), (1, 6)) == "€}"
+
+
+def test_code_block_empty_last_line_span():
+    code = get_code("    a {\n  €\n".encode("utf8"))
+    assert code.get_block_between((0, 4), (1, 3)) == "a {\n"
+    assert code.get_block_between((0, 4), (1, 3), show_line_numbers=True) == "000 a {\n001 "
+    assert code.get_block_between((1, 3), (1, 3)) == ""
@@ -0,0 +1,53 @@
+import pytest
+
+from prose.merger.merger import Merger
+
+
+def test_merge_inserts_before_line():
+    merger = Merger(["class A {\n", "    void f() {}\n", "}\n"])
+    merger.merge((1, 4), ["/**", " * Does f.", " */"])
+    assert merger.get_text() == "class A {\n    /**\n     * Does f.\n     */\n    void f() {}\n}\n"
+    assert merger.is_modified()
+
+
+def test_merge_keeps_merge_order_at_same_line():
+    merger = Merger(["a\n", "b\n"])
+    merger.merge((1, 2), ["x"])
+    merger.merge((1, 0), ["y", "z"])
+    assert merger.get_text() == "a\n  x\ny\nz\nb\n"
+
+
+def test_merge_uses_source_line_numbers():
+    # Merges address the lines of the source, whatever was inserted before them
+    merger = Merger(["a\n", "b\n", "c\n"])
+    merger.merge((2, 0), ["y"])
+    merger.merge((0, 0), ["x"])
+    merger.merge((1, 0), ["z"])
+    assert merger.get_text() == "x\na\nz\nb\ny\nc\n"
+
+
+def test_find_after_merge():
+    merger = Merger(["a\n", "}\n", "}\n"])
+    assert merger.find("}") == (1, 0)
+    assert merger.find_last("}") == (2, 0)
+    merger.merge((1, 0), ["  b"])
+    assert merger.find("}") == (2, 0)
+    assert merger.find("b") == (1, 2)
+    assert merger.get_num() == 3
+
+
+def test_merge_out_of_range_line():
+    merger = Merger(["a\n"])
+    with pytest.raises(KeyError):
+        merger.merge((1, 0), ["x"])
+    with pytest.raises(KeyError):
+        merger.merge((-1, 0), ["x"])
+    assert not merger.is_modified()
+
+
+def test_merge_leaves_source_lines():
+    src_lines = ["a\n", "b\n"]
+    merger = Merger(src_lines)
+    merger.merge((0, 0), ["x"])
+    assert merger.get_text() == "x\na\nb\n"
+    assert src_lines == ["a\n", "b\n"]
@@ -0,0 +1,30 @@
+import sys
+
+import pytest
+
+from prose.util.pager import page
+
+
+@pytest.fixture
+def tty(monkeypatch):
+    monkeypatch.setattr(sys.stdout, "isatty", lambda: True)
+    monkeypatch.setenv("TERM", "xterm")
+
+
+def test_page_without_pager_installed(tty, monkeypatch, capsys):
+    monkeypatch.setenv("PAGER", "prose-missing-pager -R")
+    page(["a", "b"])
+    assert capsys.readouterr().out == "a\nb\n"
+
+
+def test_page_dumb_terminal(tty, monkeypatch, capsys):
+    monkeypatch.setenv("TERM", "dumb")
+    monkeypatch.setenv("PAGER", "cat -n")
+    page(["a"])
+    assert capsys.readouterr().out == "a\n"
+
+
+def test_page_not_a_terminal(monkeypatch, capsys):
+    monkeypatch.setenv("PAGER", "prose-missing-pager")
+    page(iter(["a"]))
+    assert capsys.readouterr().out == "a\n"
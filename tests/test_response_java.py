@@ -0,0 +1,65 @@
+from prose.parser.java.response_java import parse_javadoc, parse_tests
+
+
+def test_javadoc_well_formed():
+    response = "/**\n * Returns the sum.\n *\n * @param a the first\n */\nint sum(int a) {"
+    assert parse_javadoc(response) == "/**\n * Returns the sum.\n *\n * @param a the first\n */"
+
+
+def test_javadoc_leading_blank_and_text_after():
+    response = "\n  /**\n   * Returns the sum.\n   */\nThis comment documents sum."
+    assert parse_javadoc(response) == "\n  /**\n   * Returns the sum.\n   */"
+
+
+def test_javadoc_malformed():
+    assert parse_javadoc("/** Returns the sum. */") is None
+    assert parse_javadoc("/**\n */") is None
+    assert parse_javadoc("Here is the comment:\n/**\n * Returns the sum.\n */") is None
+
+
+def test_tests_fenced():
+    response = (
+        "Here is a test:\n"
+        "```java\n"
+        "@Test\n"
+        "public void testGet() throws Exception {\n"
+        "    assertEquals(1, get());\n"
+        "}\n"
+        "```\n"
+    )
+    assert parse_tests(response) == (
+        (("@Test",), ("public void testGet() throws Exception",), ("{", "    assertEquals(1, get());", "}")),
+    )
+
+
+def test_tests_several():
+    response = (
+        "@Test\n"
+        "void testA() {\n"
+        "    if (a()) {\n"
+        "        fail();\n"
+        "    }\n"
+        "}\n"
+        "\n"
+        "@Test\n"
+        "@Timeout(1)\n"
+        "void testB(int x) {\n"
+        "    b(x);\n"
+        "}\n"
+    )
+    assert parse_tests(response) == (
+        (("@Test",), ("void testA()",), ("{", "    if (a()) {", "        fail();", "    }", "}")),
+        (("@Test", "@Timeout(1)"), ("void testB(int x)",), ("{", "    b(x);", "}")),
+    )
+
+
+def test_tests_keep_indented_annotations():
+    response = "    @Test\n    @Timeout(1)\n    void testGet() {\n        get();\n    }\n"
+    assert parse_tests(response) == (
+        (("@Test", "    @Timeout(1)"), ("void testGet()",), ("{", "        get();", "    }")),
+    )
+
+
+def test_tests_without_body():
+    assert parse_tests("@Test\nvoid testGet();\n") == ()
+    assert parse_tests("Some prose without any test.\n") == ()
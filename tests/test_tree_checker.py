@@ -0,0 +1,35 @@
+from prose.domain.code.clazz import Class
+from prose.domain.code.file import File
+from prose.domain.code.method import Method
+from prose.tree.tree_checker import _get_offenses
+
+TEST_SRC = """public class TestA {
+    @Test
+    public void testResetX() {
+        a.resetX( );
+        // a.getY() is not called
+        assertEquals("size(", a.$size());
+    }
+}
+"""
+
+
+def get_file(tmp_path, *names: str) -> File:
+    (tmp_path / "src" / "main").mkdir(parents=True)
+    (tmp_path / "src" / "test").mkdir(parents=True)
+    (tmp_path / "src" / "test" / "TestA.java").write_text(TEST_SRC)
+    methods = [Method(name, f"void {name}()", comment=["/** */"]) for name in names]
+    clazz = Class("org.prose", "A", "public class A", comment=["/** */"], methods=methods)
+    return File("A.java", str(tmp_path / "src" / "main" / "A.java"), clazz)
+
+
+def test_offenses_match_whole_method_names(tmp_path):
+    file = get_file(tmp_path, "resetX", "setX", "X", "size", "$size")
+    assert [offense["method"] for offense in _get_offenses(file)] == ["setX", "X", "size"]
+
+
+def test_offenses_ignore_comments_and_strings(tmp_path):
+    file = get_file(tmp_path, "getY")
+    assert _get_offenses(file) == [
+        {"path": file.path, "class": "A", "method": "getY", "missing": ["tests"]}
+    ]
@@ -0,0 +1,30 @@
+import dataclasses
+
+import pytest
+
+from prose.dao.blob.object_cache import OBJECT_CACHE
+from prose.dao.blob.tree_repository import TreeRepository
+from prose.domain.blob.tree import Tree
+
+
+@pytest.fixture
+def tree_repo(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    OBJECT_CACHE.clear()
+    return TreeRepository()
+
+
+def test_tree_saved_list_not_shared(tree_repo):
+    tree = [Tree("file", "a" * 64, "A.java")]
+    digest = tree_repo.save(tree)
+    tree.append(Tree("file", "b" * 64, "B.java"))
+    assert tree_repo.load(digest) == [Tree("file", "a" * 64, "A.java")]
+
+
+def test_tree_loaded_list_not_shared(tree_repo):
+    digest = tree_repo.save([Tree("file", "a" * 64, "A.java")])
+    OBJECT_CACHE.clear()
+    tree_repo.load(digest).clear()
+    assert tree_repo.load(digest) == [Tree("file", "a" * 64, "A.java")]
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        tree_repo.load(digest)[0].name = "B.java"
@@ -0,0 +1,74 @@
+import os
+
+import pytest
+
+pytest.importorskip("tree_sitter")
+
+from prose.dao.blob.object_cache import OBJECT_CACHE
+from prose.domain.blob.config import Config
+from prose.llm.fake.llm_fake import LLMFake
+from prose.parser.java.parser_java import ParserJava
+from prose.tree.tree_writer import TreeWriter
+
+CLASS_SRC = """package org.prose;
+
+public class {name} {{
+    public int get() {{
+        return 1;
+    }}
+}}
+"""
+
+
+def write_tree(tmp_path, monkeypatch, name: str) -> TreeWriter:
+    workspace = tmp_path / name
+    src_path = workspace / "src" / "main" / "java" / "org" / "prose"
+    src_path.mkdir(parents=True)
+    for clazz in ["A", "B", "C"]:
+        (src_path / f"{clazz}.java").write_text(CLASS_SRC.format(name=clazz))
+    monkeypatch.chdir(workspace)
+    OBJECT_CACHE.clear()
+    parser = ParserJava()
+    return TreeWriter(Config("src/main", "main"), parser, LLMFake(parser))
+
+
+def test_write_resumes_file_interrupted_in_merge(tmp_path, monkeypatch):
+    expected = write_tree(tmp_path, monkeypatch, "single").write(".")
+
+    tree_writer = write_tree(tmp_path, monkeypatch, "interrupted")
+    write_tests = tree_writer._write_tests
+    calls = []
+
+    def interrupt_second_file(file_path, file):
+        # Interrupted once the comment of the second file is merged, before its tests are
+        calls.append(file_path)
+        if len(calls) == 2:
+            raise KeyboardInterrupt()
+        return write_tests(file_path, file)
+
+    monkeypatch.setattr(tree_writer, "_write_tests", interrupt_second_file)
+    with pytest.raises(KeyboardInterrupt):
+        tree_writer.write(".")
+    assert os.path.exists(os.path.join(".prose", "journal"))
+
+    OBJECT_CACHE.clear()
+    parser = ParserJava()
+    assert TreeWriter(Config("src/main", "main"), parser, LLMFake(parser)).write(".") == expected
+
+
+def test_write_keeps_stat_cache_of_sibling_tree(tmp_path, monkeypatch):
+    tree_writer = write_tree(tmp_path, monkeypatch, "sibling")
+    os.rename("src/main/java/org/prose/C.java", "src/main/java-gen.java")
+    os.makedirs("src/main/java-gen")
+    os.rename("src/main/java-gen.java", "src/main/java-gen/C.java")
+    for file_path in ["src/main/java-gen/C.java", "src/main/java/org/prose/A.java", "src/main/java/org/prose/B.java"]:
+        # Out of the racy window of the stat cache
+        os.utime(file_path, (0, 0))
+
+    tree_writer.write("java-gen")
+    tree_writer.write("java")
+    assert sorted(tree_writer.stat_cache_repo.load()) == [
+        "src/main/java-gen/C.java",
+        "src/main/java/org/prose/A.java",
+        "src/main/java/org/prose/B.java",
+    ]